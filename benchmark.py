@@ -0,0 +1,362 @@
+"""Flash timing benchmarks
+
+Runs the flash renderer without a real desktop and prints timing figures.
+The flash suite always uses a windowless driver (--driver); the renderers
+suite uses SDL's dummy driver unless --video is given.
+
+    python benchmark.py flash                # render/present time, duration accuracy, CPU, memory
+    python benchmark.py renderers            # thread vs process under UI load
+    python benchmark.py renderers --json out.json
+    python benchmark.py memory               # list-of-str library vs interned word pool
+    python benchmark.py snapshot             # JSON vs binary snapshot at 10k, 1M and 10M words
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+
+def synthetic_words(count, prefix="word"):
+    return [f"{prefix} {i}" for i in range(count)]
+
+
+def summarize(samples):
+    """Mean and percentiles of a list of durations in seconds, in milliseconds"""
+    if not samples:
+        return {"samples": 0}
+    ordered = sorted(samples)
+
+    def percentile(p):
+        return 1000 * ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+
+    return {
+        "samples": len(ordered),
+        "mean_ms": 1000 * sum(ordered) / len(ordered),
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "max_ms": 1000 * ordered[-1]
+    }
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, None where unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def cpu_percent(seconds, during=None):
+    """Process CPU use over the next seconds of wall time (all threads)"""
+    wall, cpu = time.perf_counter(), time.process_time()
+    if during is None:
+        time.sleep(seconds)
+    else:
+        during(seconds)
+    return 100 * (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def ui_load(stop, words):
+    """Keep the GIL busy the way the Tk thread does when filling words_text"""
+    while not stop.is_set():
+        text = "\n".join(words)
+        [line.strip() for line in text.split("\n") if line.strip()]
+        time.sleep(0.01)
+
+
+def run_renderer(kind, settings, duration, load_words):
+    """Flash for duration seconds with a renderer of the given kind, return its stats"""
+    from flash_engine import RenderSession, ProcessRenderer
+    from word_source import WordSource
+
+    source = WordSource(synthetic_words(500))
+    if kind == "process":
+        renderer = ProcessRenderer(source, settings=settings)
+    else:
+        renderer = RenderSession(source, settings=settings)
+
+    stop = threading.Event()
+    load = None
+    if load_words:
+        load = threading.Thread(target=ui_load, args=(stop, synthetic_words(load_words)), daemon=True)
+        load.start()
+
+    renderer.start()
+    time.sleep(duration)
+    stats = renderer.stats()
+    stop.set()
+    if load is not None:
+        load.join()
+    renderer.stop()
+    renderer.close()
+    return stats
+
+
+def direct_flashes(args, settings, words):
+    """Call flash_word() back to back on a cold and then a warm render cache"""
+    from flash_engine import HeadlessSession
+    from word_source import WordSource
+    import pygame
+
+    session = HeadlessSession(WordSource(words), settings=settings,
+                              driver=args.driver, size=tuple(args.size))
+    session.open_window()
+    session.active = True
+    results = {}
+    try:
+        for phase in ("cold", "warm"):
+            session.render_times.clear()
+            for timing in session.presenter.timings[session.presenter.mode()].values():
+                timing.clear()
+
+            for word in words:
+                session.flash_word(word, settings)
+
+            timing = session.presenter.timings[session.presenter.mode()]
+            results[phase] = {
+                "render": summarize(list(session.render_times)),
+                "fill": summarize(list(timing["fill"])),
+                "present": summarize(list(timing["present"]))
+            }
+        results["cache"] = session.cache.stats()
+    finally:
+        session.prerender.stop()
+        session.cache.clear_fonts()
+        pygame.quit()
+    return results
+
+
+def flash_loop_run(args, settings, words):
+    """Run the real session thread: accuracy while flashing, CPU while flashing and paused"""
+    from flash_engine import HeadlessSession
+    from word_source import WordSource
+
+    session = HeadlessSession(WordSource(words), settings=settings,
+                              driver=args.driver, size=tuple(args.size))
+    session.start()
+    flashing_cpu = cpu_percent(args.seconds)
+    session.stop()
+    time.sleep(0.1)  # let the loop leave the interval wait
+    idle_cpu = cpu_percent(args.idle_seconds)
+
+    records = list(session.scheduler.records)
+    stats = session.stats()
+    session.close()
+    return {
+        "timing": stats["timing"],
+        "duration_error": summarize([abs(r[3]) for r in records]),
+        "lateness": summarize(list(session.scheduler.lateness)),
+        "render": summarize(list(session.render_times)),
+        "cpu_percent": {"flashing": flashing_cpu, "idle": idle_cpu}
+    }
+
+
+def bench_flash(args):
+    from flash_engine import FlashSettings
+    import pygame
+
+    settings = FlashSettings(flash_duration=args.flash_duration, interval=args.interval,
+                             font_size=args.font_size, dirty_rects=not args.full_screen)
+    words = synthetic_words(args.words)
+
+    direct = direct_flashes(args, settings, words)
+    loop = flash_loop_run(args, settings, words)
+    results = {
+        "environment": {
+            "platform": platform.platform(),
+            "pygame": pygame.version.ver,
+            "sdl": ".".join(map(str, pygame.get_sdl_version())),
+            "driver": args.driver,
+            "size": list(args.size)
+        },
+        "settings": {name: getattr(settings, name) for name in FlashSettings.fields()},
+        "direct": direct,
+        "loop": loop,
+        "memory": {"peak_rss_mb": peak_rss_mb(), "cache_mb": direct["cache"]["bytes"] / (1024 * 1024)}
+    }
+
+    for phase in ("cold", "warm"):
+        r = direct[phase]
+        print(f"{phase:5} {r['render']['samples']} flashes | render avg {r['render']['mean_ms']:.3f} "
+              f"p95 {r['render']['p95_ms']:.3f} ms | present avg {r['present']['mean_ms']:.3f} "
+              f"p95 {r['present']['p95_ms']:.3f} ms")
+    timing = loop["timing"]
+    print(f"loop  {timing.get('flashes', 0)} flashes | target {timing.get('target_ms', 0):.1f} ms, "
+          f"error avg {loop['duration_error'].get('mean_ms', 0):.3f} p95 "
+          f"{loop['duration_error'].get('p95_ms', 0):.3f} ms | late avg {loop['lateness'].get('mean_ms', 0):.3f} ms")
+    print(f"cpu   flashing {loop['cpu_percent']['flashing']:.1f}% | idle {loop['cpu_percent']['idle']:.2f}%")
+    rss = results["memory"]["peak_rss_mb"]
+    print(f"mem   peak rss {'n/a' if rss is None else f'{rss:.1f} MB'} | "
+          f"render cache {results['memory']['cache_mb']:.1f} MB")
+    return results
+
+
+def bench_renderers(args):
+    from flash_engine import FlashSettings
+
+    settings = FlashSettings(flash_duration=args.flash_duration, interval=args.interval)
+    results = []
+    for kind in ("thread", "process"):
+        for load_words in (0, args.load_words):
+            timing = run_renderer(kind, settings, args.seconds, load_words).get("timing", {})
+            results.append({"renderer": kind, "ui_load_words": load_words, "timing": timing})
+            print(f"{kind:8} load={load_words:<8} flashes={timing.get('flashes', 0):<4} "
+                  f"jitter avg {timing.get('mean_jitter_ms', 0):6.2f} max {timing.get('max_jitter_ms', 0):6.2f} ms | "
+                  f"late avg {timing.get('mean_late_ms', 0):6.2f} max {timing.get('max_late_ms', 0):6.2f} ms")
+    return results
+
+
+def synthetic_library(words, categories, shared):
+    """{name: [words]} with a fraction of words repeated across categories
+
+    Every category gets its own str objects, as when categories are read
+    from the library one by one.
+    """
+    per_category = words // categories
+    common = int(per_category * shared)
+    return {f"category {c}": [f"shared affirmation {i}" for i in range(common)] +
+            [f"affirmation {c}-{i}" for i in range(per_category - common)]
+            for c in range(categories)}
+
+
+def bench_memory(args):
+    import tracemalloc
+    from word_pool import WordPool, PooledWords, memory_report
+
+    library = synthetic_library(args.words, args.categories, args.shared)
+    report = memory_report(library)
+
+    # Cross-check the accounting with what the allocator actually hands out
+    tracemalloc.start()
+    pool = WordPool()
+    pooled = {name: PooledWords(pool, pool.intern_many(words)) for name, words in library.items()}
+    report["pool_traced_bytes"] = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del pooled, pool
+
+    start = time.perf_counter()
+    pool = WordPool()
+    for words in library.values():
+        pool.intern_many(words)
+    report["intern_s"] = time.perf_counter() - start
+
+    mb = 1024 * 1024
+    print(f"{report['words']:,} words in {report['categories']} categories, {report['distinct_words']:,} distinct")
+    print(f"lists {report['list_bytes'] / mb:8.1f} MB | pool {report['pool_bytes'] / mb:8.1f} MB "
+          f"(traced {report['pool_traced_bytes'] / mb:.1f} MB) | {report['ratio']:.1f}x smaller | "
+          f"interned in {report['intern_s']:.2f} s")
+    return report
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def bench_snapshot(args):
+    import tempfile
+    from word_snapshot import Snapshot, write_snapshot
+
+    def save_json(path, library):
+        with open(path, 'w') as f:
+            json.dump({"settings": {}, "categories": library}, f, indent=4)
+
+    def load_json(path):
+        with open(path, 'r') as f:
+            return json.load(f)["categories"]
+
+    def load_snapshot(path):
+        with Snapshot(path) as snapshot:
+            return dict(snapshot.items())
+
+    def open_snapshot_category(path, name):
+        # What selecting one category costs: open, decode just that one
+        with Snapshot(path) as snapshot:
+            return snapshot[name]
+
+    results = []
+    with tempfile.TemporaryDirectory() as folder:
+        json_path = os.path.join(folder, "library.json")
+        snapshot_path = os.path.join(folder, "library.snap")
+        for size in args.sizes:
+            library = synthetic_library(size, args.categories, 0.0)
+            name = next(iter(library))
+            row = {"words": size}
+            row["json_save_s"], _ = timed(save_json, json_path, library)
+            row["json_load_s"], _ = timed(load_json, json_path)
+            row["json_bytes"] = os.path.getsize(json_path)
+            row["snapshot_save_s"], _ = timed(write_snapshot, snapshot_path, library)
+            row["snapshot_load_s"], loaded = timed(load_snapshot, snapshot_path)
+            row["snapshot_category_s"], _ = timed(open_snapshot_category, snapshot_path, name)
+            row["snapshot_bytes"] = os.path.getsize(snapshot_path)
+            assert loaded == library
+            del library, loaded
+            results.append(row)
+            print(f"{size:>10,} words | json save {row['json_save_s']:7.3f} s load {row['json_load_s']:7.3f} s "
+                  f"{row['json_bytes'] / 1e6:8.1f} MB | snapshot save {row['snapshot_save_s']:7.3f} s "
+                  f"load {row['snapshot_load_s']:7.3f} s one category {row['snapshot_category_s'] * 1000:8.2f} ms "
+                  f"{row['snapshot_bytes'] / 1e6:8.1f} MB")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subliminal flash benchmarks")
+    parser.add_argument("--video", action="store_true",
+                        help="renderers suite: use the real video driver instead of SDL's dummy one "
+                             "(the flash suite always uses its --driver)")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON")
+    sub = parser.add_subparsers(dest="suite", required=True)
+
+    flash = sub.add_parser("flash", help="per-flash render/present time, duration accuracy, idle CPU and memory")
+    flash.add_argument("--words", type=int, default=200, help="distinct words flashed per phase")
+    flash.add_argument("--seconds", type=float, default=5.0, help="how long to run the flash loop")
+    flash.add_argument("--idle-seconds", type=float, default=2.0, help="how long to measure CPU while paused")
+    flash.add_argument("--interval", type=float, default=0.1)
+    flash.add_argument("--flash-duration", type=float, default=0.05)
+    flash.add_argument("--font-size", type=int, default=36)
+    flash.add_argument("--full-screen", action="store_true", help="fill and flip the whole screen instead of dirty rects")
+    flash.add_argument("--driver", default="dummy", choices=("dummy", "offscreen"), help="SDL video driver")
+    flash.add_argument("--size", type=int, nargs=2, default=(1920, 1080), metavar=("W", "H"))
+    flash.set_defaults(run=bench_flash)
+
+    renderers = sub.add_parser("renderers", help="flash jitter of the thread and process renderers under UI load")
+    renderers.add_argument("--seconds", type=float, default=5.0)
+    renderers.add_argument("--interval", type=float, default=0.2)
+    renderers.add_argument("--flash-duration", type=float, default=0.05)
+    renderers.add_argument("--load-words", type=int, default=500000,
+                           help="size of the word list the synthetic UI load joins and splits")
+    renderers.set_defaults(run=bench_renderers)
+
+    memory = sub.add_parser("memory", help="memory of a dict-of-lists library against the interned word pool")
+    memory.add_argument("--words", type=int, default=2000000, help="total words across all categories")
+    memory.add_argument("--categories", type=int, default=20)
+    memory.add_argument("--shared", type=float, default=0.5,
+                        help="fraction of each category's words that every category shares")
+    memory.set_defaults(run=bench_memory)
+
+    snapshot = sub.add_parser("snapshot", help="load/save time and size of JSON against binary snapshots")
+    snapshot.add_argument("--sizes", type=int, nargs="+", default=(10000, 1000000, 10000000),
+                          help="library sizes in words")
+    snapshot.add_argument("--categories", type=int, default=20)
+    snapshot.set_defaults(run=bench_snapshot)
+
+    args = parser.parse_args()
+    if not args.video:
+        # Inherited by the renderer process as well
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    results = args.run(args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"suite": args.suite, "python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,938 @@
+"""Rendering helpers shared by the classic and modern flash loops"""
+from collections import OrderedDict, deque
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import pygame
+from flash_settings import FlashSettings, hex_to_rgb, parse_color
+from word_source import WordSource
+
+
+class RenderCache:
+    """LRU cache of fonts and rendered word surfaces bounded by a byte budget"""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, font_name='Arial'):
+        self.max_bytes = max_bytes
+        self.font_name = font_name
+
+        self.fonts = {}  # {(font_name, size): Font}
+        self.surfaces = OrderedDict()  # {(font_name, size, color, word): Surface}
+        self.current_bytes = 0
+
+        # Shared by the flash loop and the pre-render thread
+        self.lock = threading.RLock()
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_font(self, size):
+        """Return a cached SysFont for the given size"""
+        key = (self.font_name, size)
+        with self.lock:
+            font = self.fonts.get(key)
+            if font is None:
+                font = pygame.font.SysFont(self.font_name, size)
+                self.fonts[key] = font
+            return font
+
+    def contains(self, word, size, color):
+        """Check for a rendered surface without touching the counters"""
+        return (self.font_name, size, color, word) in self.surfaces
+
+    def render(self, word, size, color, count=True):
+        """Return the rendered surface for a word, rasterizing it on a miss"""
+        key = (self.font_name, size, color, word)
+        with self.lock:
+            surface = self.surfaces.get(key)
+            if surface is not None:
+                self.surfaces.move_to_end(key)
+                if count:
+                    self.hits += 1
+                return surface
+
+            if count:
+                self.misses += 1
+            surface = self.get_font(size).render(word, True, color)
+            nbytes = self.surface_bytes(surface)
+
+            # Surfaces larger than the whole budget are returned without caching
+            if nbytes <= self.max_bytes:
+                self.surfaces[key] = surface
+                self.current_bytes += nbytes
+                self.evict()
+            return surface
+
+    def evict(self):
+        """Drop least recently used surfaces until the cache fits the budget"""
+        while self.current_bytes > self.max_bytes and self.surfaces:
+            _, surface = self.surfaces.popitem(last=False)
+            self.current_bytes -= self.surface_bytes(surface)
+            self.evictions += 1
+
+    def set_budget(self, max_bytes):
+        """Change the byte budget, evicting immediately if it shrank"""
+        with self.lock:
+            self.max_bytes = max_bytes
+            self.evict()
+
+    def clear_fonts(self):
+        """Forget cached fonts (they become invalid after pygame.quit)"""
+        with self.lock:
+            self.fonts.clear()
+
+    def clear(self):
+        """Drop all cached fonts and surfaces"""
+        with self.lock:
+            self.fonts.clear()
+            self.surfaces.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Return a snapshot of the cache counters"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.surfaces),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes
+        }
+
+    def describe(self):
+        """Short human readable summary for status labels"""
+        s = self.stats()
+        return (f"cache {s['hit_rate']:.0%} hits ({s['hits']}/{s['hits'] + s['misses']}), "
+                f"{s['entries']} words, {s['bytes'] / (1024 * 1024):.1f}/"
+                f"{s['max_bytes'] / (1024 * 1024):.0f} MB, {s['evictions']} evicted")
+
+    @staticmethod
+    def surface_bytes(surface):
+        """Approximate memory held by a surface's pixel buffer"""
+        return surface.get_pitch() * surface.get_height()
+
+
+class PreRenderer:
+    """Background producer that rasterizes upcoming words into the render cache
+
+    The flash loop calls prepare() with the next few words after each flash,
+    so by the time a word is due its surface is already in the cache and the
+    flash itself only has to blit. Changing the font size or color drops the
+    queued work for the old settings and starts over with the new ones.
+    """
+
+    def __init__(self, cache, lookahead=8):
+        self.cache = cache
+        self.lookahead = lookahead
+
+        self.pending = deque()
+        self.key = None  # (font_size, color) the pending words are rendered with
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+
+        # Counters
+        self.rendered = 0
+        self.invalidations = 0
+
+    def start(self):
+        """Start the producer thread"""
+        with self.cond:
+            if self.running:
+                return
+            self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop the producer thread and drop pending work"""
+        with self.cond:
+            self.running = False
+            self.pending.clear()
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def prepare(self, words, font_size, color):
+        """Queue words to be rendered with the given settings"""
+        with self.cond:
+            key = (font_size, color)
+            if key != self.key:
+                # Settings changed - anything queued for the old ones is stale
+                if self.key is not None:
+                    self.invalidations += 1
+                self.key = key
+                self.pending.clear()
+            for word in words[:self.lookahead]:
+                if word not in self.pending:
+                    self.pending.append(word)
+            self.cond.notify()
+
+    def run(self):
+        """Producer loop"""
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                word = self.pending.popleft()
+                font_size, color = self.key
+
+            if not self.cache.contains(word, font_size, color):
+                # Warming the cache is not a lookup, keep it out of the hit rate
+                self.cache.render(word, font_size, color, count=False)
+                self.rendered += 1
+
+
+class Presenter:
+    """Draws words onto the flash window and pushes them to the display
+
+    With dirty_rects enabled only the text's bounding box is cleared and sent
+    to the display (display.update(rects)); otherwise the whole screen is
+    filled and flipped. Fill and present times are kept per mode so the two
+    paths can be compared.
+    """
+
+    def __init__(self, screen, transparent_color, dirty_rects=True, history=500):
+        self.screen = screen
+        self.transparent_color = transparent_color
+        self.dirty_rects = dirty_rects
+        self.last_rect = None  # Area covered by the word currently on screen
+
+        # {mode: {"fill": deque, "present": deque}} in seconds
+        self.timings = {mode: {"fill": deque(maxlen=history), "present": deque(maxlen=history)}
+                        for mode in ("dirty", "full")}
+
+    def mode(self):
+        return "dirty" if self.dirty_rects else "full"
+
+    def show(self, surface, rect):
+        """Replace whatever is on screen with the given surface"""
+        rect = rect.clip(self.screen.get_rect())
+        start = time.perf_counter()
+
+        if self.dirty_rects:
+            # Erase the previous word (if any) and only touch the two rects
+            dirty = [rect]
+            if self.last_rect is not None:
+                self.screen.fill(self.transparent_color, self.last_rect)
+                dirty.append(self.last_rect)
+            filled = time.perf_counter()
+            self.screen.blit(surface, rect)
+            pygame.display.update(dirty)
+        else:
+            self.screen.fill(self.transparent_color)
+            filled = time.perf_counter()
+            self.screen.blit(surface, rect)
+            pygame.display.flip()
+
+        self.record(start, filled)
+        self.last_rect = rect
+
+    def clear(self):
+        """Remove the word from screen"""
+        start = time.perf_counter()
+
+        if self.dirty_rects:
+            if self.last_rect is None:
+                return
+            self.screen.fill(self.transparent_color, self.last_rect)
+            filled = time.perf_counter()
+            pygame.display.update(self.last_rect)
+        else:
+            self.screen.fill(self.transparent_color)
+            filled = time.perf_counter()
+            pygame.display.flip()
+
+        self.record(start, filled)
+        self.last_rect = None
+
+    def record(self, start, filled):
+        timing = self.timings[self.mode()]
+        timing["fill"].append(filled - start)
+        timing["present"].append(time.perf_counter() - filled)
+
+    def stats(self):
+        """Return mean fill and present times in milliseconds for each mode"""
+        result = {}
+        for mode, timing in self.timings.items():
+            if not timing["fill"]:
+                continue
+            result[mode] = {
+                "samples": len(timing["fill"]),
+                "fill_ms": 1000 * sum(timing["fill"]) / len(timing["fill"]),
+                "present_ms": 1000 * sum(timing["present"]) / len(timing["present"])
+            }
+        return result
+
+    def describe(self):
+        """Short human readable summary for status labels"""
+        parts = [f"{mode}: fill {s['fill_ms']:.2f} ms, present {s['present_ms']:.2f} ms"
+                 for mode, s in self.stats().items()]
+        return " | ".join(parts) if parts else "no frames presented"
+
+
+def detect_refresh_rate(default=60):
+    """Return the desktop refresh rate in Hz, or default when SDL can't tell"""
+    try:
+        rates = pygame.display.get_desktop_refresh_rates()
+        if rates and rates[0] > 0:
+            return rates[0]
+    except (AttributeError, pygame.error):
+        pass  # pygame < 2.2 or display not initialized
+    return default
+
+
+class FrameScheduler:
+    """Deadline based timing for flashes and intervals on a monotonic clock
+
+    Flash durations are rounded to whole display frames (never less than
+    one), and every wait targets an absolute deadline instead of counting
+    sleeps, so rounding errors don't accumulate. The last stretch before a
+    deadline is spun rather than slept because OS sleeps overshoot; the spin
+    margin follows the worst overshoot seen so far.
+    """
+
+    def __init__(self, refresh_rate=60, history=500):
+        self.refresh_rate = refresh_rate
+        self.frame_time = 1.0 / refresh_rate
+        self.spin_margin = 0.002
+        self.records = deque(maxlen=history)  # (requested, target, actual, jitter) in seconds
+        self.lateness = deque(maxlen=history)  # flash start minus its scheduled time, in seconds
+
+    @staticmethod
+    def now():
+        return time.perf_counter()
+
+    def frames_for(self, duration):
+        """Number of whole frames closest to the requested duration"""
+        return max(1, round(duration * self.refresh_rate))
+
+    def flash_deadline(self, shown_at, duration):
+        """Deadline for clearing a word that appeared at shown_at"""
+        return shown_at + self.frames_for(duration) * self.frame_time
+
+    def wait_until(self, deadline, check=None, step=None):
+        """Wait for the deadline, calling check() at least every step seconds
+
+        Returns False as soon as check() returns False, True once the deadline
+        has passed.
+        """
+        step = step or self.frame_time
+        while True:
+            if check is not None and not check():
+                return False
+            remaining = deadline - self.now()
+            if remaining <= 0:
+                return True
+            if remaining > self.spin_margin:
+                requested = min(step, remaining - self.spin_margin)
+                before = self.now()
+                time.sleep(requested)
+                overshoot = self.now() - before - requested
+                if overshoot > self.spin_margin:
+                    self.spin_margin = min(overshoot + 0.0005, 0.02)
+            else:
+                # Final stretch, spin without calling back into the app
+                while self.now() < deadline:
+                    pass
+                return True
+
+    def idle_until(self, deadline, waiter, pump=None):
+        """Sleep on the waiter until the deadline unless something wakes it
+
+        pump() is called whenever the waiter returns and should return False
+        once flashing has to stop. Returns the set of wake reasons, which is
+        empty when the deadline was reached.
+        """
+        while True:
+            remaining = deadline - self.now() - self.spin_margin
+            if remaining <= 0:
+                break
+            reasons = waiter.wait(remaining)
+            if pump is not None and not pump():
+                reasons.add("stop")
+            if reasons:
+                return reasons
+        self.wait_until(deadline)
+        return set()
+
+    def record(self, requested, shown_at, cleared_at):
+        """Store the measured on-screen time of one flash"""
+        target = self.frames_for(requested) * self.frame_time
+        actual = cleared_at - shown_at
+        self.records.append((requested, target, actual, actual - target))
+
+    def record_lateness(self, due, shown_at):
+        """Store how late a flash appeared relative to its scheduled time"""
+        self.lateness.append(max(0.0, shown_at - due))
+
+    def stats(self):
+        """Return duration accuracy figures in milliseconds"""
+        if not self.records:
+            return {"flashes": 0, "refresh_rate": self.refresh_rate}
+        jitters = [abs(r[3]) for r in self.records]
+        last = self.records[-1]
+        result = {
+            "flashes": len(self.records),
+            "refresh_rate": self.refresh_rate,
+            "requested_ms": 1000 * last[0],
+            "target_ms": 1000 * last[1],
+            "actual_ms": 1000 * sum(r[2] for r in self.records) / len(self.records),
+            "mean_jitter_ms": 1000 * sum(jitters) / len(jitters),
+            "max_jitter_ms": 1000 * max(jitters)
+        }
+        if self.lateness:
+            result["mean_late_ms"] = 1000 * sum(self.lateness) / len(self.lateness)
+            result["max_late_ms"] = 1000 * max(self.lateness)
+        return result
+
+    def describe(self):
+        """Short human readable summary for status labels"""
+        s = self.stats()
+        if not s["flashes"]:
+            return "no flashes timed"
+        text = (f"flash {s['requested_ms']:.0f} ms -> {s['target_ms']:.1f} ms "
+                f"({self.frames_for(s['requested_ms'] / 1000)} frames @ {s['refresh_rate']} Hz), "
+                f"measured {s['actual_ms']:.1f} ms, jitter avg {s['mean_jitter_ms']:.2f} / "
+                f"max {s['max_jitter_ms']:.2f} ms")
+        if "mean_late_ms" in s:
+            text += f", late avg {s['mean_late_ms']:.2f} / max {s['max_late_ms']:.2f} ms"
+        return text
+
+
+class IdleWaiter:
+    """Lets the flash thread sleep until a deadline, a stop request or a settings change
+
+    The thread blocks on a condition variable instead of polling, so an idle
+    interval costs no wakeups apart from an event pump every pump_interval
+    seconds, which keeps Windows from flagging the window as not responding
+    (it does so after 5 s without message processing).
+    """
+
+    def __init__(self, pump_interval=2.0):
+        self.pump_interval = pump_interval
+        self.cond = threading.Condition()
+        self.reasons = set()
+
+    def wake(self, reason):
+        """Wake the waiting thread, safe to call from any thread"""
+        with self.cond:
+            self.reasons.add(reason)
+            self.cond.notify_all()
+
+    def reset(self):
+        """Forget wake reasons left over from a previous run"""
+        with self.cond:
+            self.reasons.clear()
+
+    def wait(self, timeout):
+        """Block for up to timeout seconds, returns the set of wake reasons"""
+        with self.cond:
+            if not self.reasons:
+                self.cond.wait(min(timeout, self.pump_interval))
+            reasons, self.reasons = self.reasons, set()
+            return reasons
+
+
+class RenderSession:
+    """Long-lived flash window that survives start/stop cycles
+
+    A single session thread initializes pygame, creates the full-screen
+    window and applies the Win32 layered/topmost styles once. Stopping clears
+    and hides the window instead of tearing it down, so starting again is
+    just a show: fonts, the render cache and the pre-render thread all stay
+    warm.
+
+    Words come from a source object (normally a word_source.WordSource) with:
+        len(source)          -> number of words, the session idles at 0
+        next_word()          -> next word to show, or None to stop
+        upcoming_words(n)    -> the n words after that
+    Settings are pushed in as FlashSettings snapshots via update_settings().
+    """
+
+    # Set a color key for transparency (magenta is commonly used)
+    TRANSPARENT_COLOR = (255, 0, 255)
+
+    def __init__(self, source, caption="Subliminal Flash", cache=None, settings=None):
+        self.source = source
+        self.caption = caption
+        self.cache = cache or RenderCache()
+        self.settings = settings or FlashSettings()
+        self.waiter = IdleWaiter()
+
+        self.active = False    # flashing (True) or paused with the window hidden
+        self.closing = False
+        self.thread = None
+
+        # Time spent getting each flashed word's surface (cache hit or rasterize)
+        self.render_times = deque(maxlen=500)
+
+        # Created on the session thread once the window exists
+        self.screen = None
+        self.presenter = None
+        self.scheduler = None
+        self.prerender = None
+
+    def start(self):
+        """Show the window and start flashing, creating the session on first use"""
+        self.active = True
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, daemon=True)
+            self.thread.start()
+        self.waiter.wake("start")
+
+    def stop(self):
+        """Stop flashing and hide the window, keeping everything else alive"""
+        self.active = False
+        self.waiter.wake("stop")
+
+    def close(self, timeout=2.0):
+        """Tear the session down for good"""
+        self.active = False
+        self.closing = True
+        self.waiter.wake("close")
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+
+    def update_settings(self, settings):
+        """Swap in a new FlashSettings snapshot, safe to call from any thread"""
+        self.settings = settings
+        self.waiter.wake("settings")
+
+    def words_changed(self, index=None):
+        """Re-queue pre-rendering after the source's word list was swapped
+
+        index is only needed by ProcessRenderer, here the shared source has
+        already applied it.
+        """
+        self.waiter.wake("words")
+
+    def sync_order(self, timeout=1.0):
+        """Return the source's order, which this session advances in place"""
+        with self.source.lock:
+            return self.source.order
+
+    def run(self):
+        """Session thread"""
+        try:
+            self.open_window()
+            while not self.closing:
+                if self.active and len(self.source):
+                    self.set_window_visible(True)
+                    self.flash_loop()
+
+                    # Leave nothing on screen while paused
+                    self.presenter.clear()
+                    self.set_window_visible(False)
+                else:
+                    # Paused, or waiting for words to be swapped in
+                    self.waiter.wait(self.waiter.pump_interval)
+                    self.poll_events()
+        finally:
+            # Still None if open_window failed before starting it, let that error through
+            if self.prerender is not None:
+                self.prerender.stop()
+                self.prerender = None
+
+            # Fonts do not survive pygame.quit, rendered surfaces do
+            self.cache.clear_fonts()
+            pygame.quit()
+
+    def open_window(self):
+        """Initialize pygame and set up the window, presenter and scheduler"""
+        pygame.init()
+        self.create_window()
+
+        # Fill screen with transparent color initially
+        self.screen.fill(self.TRANSPARENT_COLOR)
+        pygame.display.flip()
+
+        # Only the word's bounding box is redrawn unless dirty rects are turned off
+        self.presenter = Presenter(self.screen, self.TRANSPARENT_COLOR)
+
+        # Flash and interval waits are deadline based and frame aligned
+        self.scheduler = FrameScheduler(self.display_refresh_rate())
+
+        # Rasterize upcoming words in the background while we wait
+        self.prerender = PreRenderer(self.cache)
+        self.prerender.start()
+
+    def create_window(self):
+        """Create the transparent full-screen window"""
+        # Get screen info
+        screen_info = pygame.display.Info()
+        self.screen_width = screen_info.current_w
+        self.screen_height = screen_info.current_h
+
+        # Create fullscreen window
+        self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), pygame.NOFRAME)
+        pygame.display.set_caption(self.caption)
+
+        self.make_window_transparent()
+
+    def display_refresh_rate(self):
+        return detect_refresh_rate()
+
+    def make_window_transparent(self):
+        """Make the window always on top, click-through and color keyed (Windows)"""
+        try:
+            import ctypes
+            hwnd = pygame.display.get_wm_info()["window"]
+
+            # Windows API constants
+            GWL_EXSTYLE = -20
+            WS_EX_LAYERED = 0x00080000
+            WS_EX_TOPMOST = 0x00000008
+            WS_EX_TRANSPARENT = 0x00000020
+            LWA_COLORKEY = 0x00000001
+
+            # Get current extended style
+            ex_style = ctypes.windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
+
+            # Add layered, topmost, and transparent (click-through) styles
+            new_ex_style = ex_style | WS_EX_LAYERED | WS_EX_TOPMOST | WS_EX_TRANSPARENT
+            ctypes.windll.user32.SetWindowLongW(hwnd, GWL_EXSTYLE, new_ex_style)
+
+            # Set the transparent color key
+            color = self.TRANSPARENT_COLOR
+            ctypes.windll.user32.SetLayeredWindowAttributes(hwnd,
+                ctypes.c_ulong(color[2] << 16 | color[1] << 8 | color[0]),
+                0, LWA_COLORKEY)
+        except:
+            pass  # Fallback if we can't set transparency
+
+    def set_window_visible(self, visible):
+        """Show (on top, without stealing focus) or hide the flash window"""
+        try:
+            import ctypes
+            hwnd = pygame.display.get_wm_info()["window"]
+
+            # Windows API constants
+            SW_HIDE = 0
+            HWND_TOPMOST = -1
+            SWP_NOMOVE = 0x0002
+            SWP_NOSIZE = 0x0001
+            SWP_NOACTIVATE = 0x0010
+            SWP_SHOWWINDOW = 0x0040
+
+            if visible:
+                # Set window to always on top
+                ctypes.windll.user32.SetWindowPos(hwnd, HWND_TOPMOST, 0, 0, 0, 0,
+                                                 SWP_NOMOVE | SWP_NOSIZE | SWP_NOACTIVATE | SWP_SHOWWINDOW)
+            else:
+                ctypes.windll.user32.ShowWindow(hwnd, SW_HIDE)
+        except:
+            # Not on Windows, fall back to SDL's window API where available
+            try:
+                from pygame._sdl2.video import Window
+                window = Window.from_display_module()
+                if visible:
+                    window.show()
+                else:
+                    window.hide()
+            except:
+                pass
+
+    def flash_loop(self):
+        """Flash words until the session is stopped"""
+        settings = self.settings
+        self.cache.set_budget(settings.render_cache_mb * 1024 * 1024)
+        self.prerender.lookahead = settings.prerender_words
+
+        due = None  # Scheduled time of the next flash
+        while self.active and not self.closing:
+            settings = self.settings
+            word = self.source.next_word()
+            if word is None:
+                break
+
+            # Flash the word
+            self.presenter.dirty_rects = settings.dirty_rects
+            self.flash_word(word, settings, due)
+
+            # Hand the next words to the producer
+            upcoming = self.source.upcoming_words(self.prerender.lookahead)
+            self.prerender.prepare(upcoming, settings.font_size, settings.text_rgb)
+
+            # Sleep until the next flash is due, waking early for stop requests,
+            # setting changes and word list swaps
+            interval_start = self.scheduler.now()
+            while self.active and not self.closing:
+                deadline = interval_start + self.settings.interval
+                reasons = self.scheduler.idle_until(deadline, self.waiter, self.poll_events)
+                if not reasons:
+                    due = deadline
+                    break
+
+                # Re-render the queue if the words, font size or color changed meanwhile
+                if "words" in reasons:
+                    upcoming = self.source.upcoming_words(self.prerender.lookahead)
+                settings = self.settings
+                self.prerender.prepare(upcoming, settings.font_size, settings.text_rgb)
+
+    def flash_word(self, word, settings, due=None):
+        """Flash a single word on screen, due is the time it was scheduled for"""
+        # Reuse the cached font and surface when this word was rendered before
+        start = time.perf_counter()
+        text_surface = self.cache.render(word, settings.font_size, settings.text_rgb)
+        self.render_times.append(time.perf_counter() - start)
+        text_rect = text_surface.get_rect(center=(self.screen_width//2, self.screen_height//2))
+
+        # Display only the text (no background)
+        self.presenter.show(text_surface, text_rect)
+
+        shown_at = self.scheduler.now()
+        if due is not None:
+            self.scheduler.record_lateness(due, shown_at)
+
+        # Keep displayed for a whole number of frames
+        deadline = self.scheduler.flash_deadline(shown_at, settings.flash_duration)
+        completed = self.scheduler.wait_until(deadline, self.poll_events)
+
+        # Clear the word with transparent color
+        self.presenter.clear()
+
+        # Flashes cut short by a stop would skew the accuracy figures
+        if completed:
+            self.scheduler.record(settings.flash_duration, shown_at, self.scheduler.now())
+
+    def poll_events(self):
+        """Pump pygame events, returns False once flashing should stop"""
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.active = False
+        return self.active and not self.closing
+
+    def stats(self):
+        """Raw cache, presentation and timing stats"""
+        render = {}
+        if self.render_times:
+            render = {
+                "samples": len(self.render_times),
+                "mean_ms": 1000 * sum(self.render_times) / len(self.render_times),
+                "max_ms": 1000 * max(self.render_times)
+            }
+        return {
+            "cache": self.cache.stats(),
+            "render": render,
+            "present": self.presenter.stats() if self.presenter is not None else {},
+            "timing": self.scheduler.stats() if self.scheduler is not None else {}
+        }
+
+    def describe(self):
+        """Summarize cache, presentation and timing stats for status labels"""
+        parts = [self.cache.describe()]
+        render = self.stats()["render"]
+        if render:
+            parts.append(f"render avg {render['mean_ms']:.2f} / max {render['max_ms']:.2f} ms")
+        if self.presenter is not None:
+            parts.append(self.presenter.describe())
+        if self.scheduler is not None:
+            parts.append(self.scheduler.describe())
+        return parts
+
+
+class HeadlessSession(RenderSession):
+    """RenderSession that runs without a desktop
+
+    Uses one of SDL's windowless video drivers ("dummy" or "offscreen") so
+    the flash loop can be driven on a build machine or under Linux CI. The
+    window has a fixed size and the Win32 window styling is skipped; cache,
+    presentation and timing all go through the same code as the real thing.
+    """
+
+    def __init__(self, source, caption="Subliminal Flash", cache=None, settings=None,
+                 driver="dummy", size=(1920, 1080), refresh_rate=60):
+        super().__init__(source, caption, cache, settings)
+        self.driver = driver
+        self.size = size
+        self.refresh_rate = refresh_rate
+
+    def open_window(self):
+        # Must be set before the display module is initialized
+        os.environ["SDL_VIDEODRIVER"] = self.driver
+        super().open_window()
+
+    def create_window(self):
+        """Create a window of the configured size on the windowless driver"""
+        self.screen_width, self.screen_height = self.size
+        self.screen = pygame.display.set_mode(self.size, pygame.NOFRAME)
+        pygame.display.set_caption(self.caption)
+
+    def display_refresh_rate(self):
+        # Windowless drivers report no refresh rate, so assume one
+        return self.refresh_rate
+
+    def make_window_transparent(self):
+        pass
+
+    def set_window_visible(self, visible):
+        pass
+
+
+def renderer_process_main(commands, results, caption):
+    """Entry point of the renderer process
+
+    Commands are tuples ("words", words, order, index), ("settings", FlashSettings),
+    ("start",), ("stop",), ("stats", request_id), ("order", request_id) and
+    ("close",).
+    """
+    source = WordSource()
+    session = RenderSession(source, caption)
+    while True:
+        command = commands.get()
+        name = command[0]
+        if name == "words":
+            words, order, index = command[1:]
+            if order is not None:
+                source.set_order(order, words)
+            else:
+                # Same order as before, keep its progress
+                source.swap(words, index)
+            session.words_changed()
+        elif name == "settings":
+            session.update_settings(command[1])
+        elif name == "start":
+            session.start()
+        elif name == "stop":
+            session.stop()
+        elif name == "stats":
+            results.put((command[1], (session.stats(), session.describe())))
+        elif name == "order":
+            # The order carries state the parent persists (e.g. exposure counts)
+            with source.lock:
+                results.put((command[1], source.order))
+        elif name == "close":
+            session.close()
+            return
+
+
+class ProcessRenderer:
+    """Runs the render session in a child process
+
+    Keeps flash timing away from the Tk thread's GIL: the child owns the
+    window and the flash loop, and the parent only sends word lists and
+    settings over a multiprocessing queue. Stats come back over a second
+    queue. Exposes the same start/stop/close/update_settings/words_changed/
+    stats/describe interface as RenderSession.
+    """
+
+    def __init__(self, source, caption="Subliminal Flash", settings=None):
+        self.source = source
+        self.caption = caption
+        self.settings = settings or FlashSettings()
+
+        self.process = None
+        self.commands = None
+        self.results = None
+        self.sent_words = None  # Word list and order objects the child currently has
+        self.request_ids = itertools.count()
+
+    def ensure_process(self):
+        """Spawn the renderer process if it isn't running"""
+        if self.process is not None and self.process.is_alive():
+            return
+        # Spawn rather than fork, forking a process that runs Tk and threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        self.commands = context.Queue()
+        self.results = context.Queue()
+        self.process = context.Process(target=renderer_process_main,
+                                       args=(self.commands, self.results, self.caption),
+                                       daemon=True)
+        self.process.start()
+        self.sent_words = None
+
+    def alive(self):
+        return self.process is not None and self.process.is_alive()
+
+    def start(self):
+        """Send the current words and settings, then start flashing"""
+        self.ensure_process()
+        self.commands.put(("settings", self.settings))
+        self.send_words()
+        self.commands.put(("start",))
+
+    def stop(self):
+        if self.alive():
+            self.commands.put(("stop",))
+
+    def close(self, timeout=2.0):
+        """Shut the renderer process down"""
+        if self.alive():
+            self.commands.put(("close",))
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+        self.process = None
+
+    def update_settings(self, settings):
+        self.settings = settings
+        if self.alive():
+            self.commands.put(("settings", settings))
+
+    def words_changed(self, index=None):
+        if self.alive():
+            self.send_words(index)
+
+    def send_words(self, index=None):
+        """Send the word list and order, unless the child already has these exact objects
+
+        Unlike an in-process swap this pickles the whole list, so it is O(n).
+        The order is only sent when it was replaced: the child's copy is the
+        one advancing while flashing (see sync_order).
+        """
+        words, order = self.source.snapshot()
+        sent_words, sent_order = self.sent_words or (None, None)
+        if order is not sent_order:
+            self.commands.put(("words", words, order, index))
+        elif words is not sent_words:
+            self.commands.put(("words", words, None, index))
+        self.sent_words = (words, order)
+
+    def request(self, name, timeout=1.0):
+        """Send a (name, request_id) command and return the child's answer, None on timeout"""
+        if not self.alive():
+            return None
+        request_id = next(self.request_ids)
+        self.commands.put((name, request_id))
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                reply = self.results.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                return None
+            # Drop late answers to earlier requests that timed out
+            if reply[0] == request_id:
+                return reply[1]
+
+    def request_stats(self, timeout=1.0):
+        """Ask the child for (stats, describe) or return None if it doesn't answer"""
+        return self.request("stats", timeout)
+
+    def sync_order(self, timeout=1.0):
+        """Replace the source's order with the child's copy, which has advanced while flashing"""
+        order = self.request("order", timeout)
+        if order is not None and self.sent_words is not None:
+            with self.source.lock:
+                if self.source.order is self.sent_words[1]:
+                    self.source.order = order
+                    self.sent_words = (self.sent_words[0], order)
+        return self.source.order
+
+    def stats(self):
+        reply = self.request_stats()
+        return reply[0] if reply else {}
+
+    def describe(self):
+        reply = self.request_stats()
+        return reply[1] if reply else ["renderer process not responding"]
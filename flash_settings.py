@@ -0,0 +1,71 @@
+"""Flash settings snapshot, importable without pygame"""
+
+
+def hex_to_rgb(hex_color):
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+
+
+def parse_color(hex_color, default=(255, 255, 255)):
+    """Convert a color setting to RGB, falling back to white"""
+    try:
+        return hex_to_rgb(hex_color)
+    except (ValueError, AttributeError):
+        return default
+
+
+class FlashSettings:
+    """Immutable snapshot of everything the flash loop reads
+
+    Built on the Tk thread whenever a setting actually changes and handed to
+    the renderer as a whole, so the flash thread never touches Tk variables
+    and can't observe a half-updated set of values.
+    """
+
+    __slots__ = ("flash_duration", "interval", "font_size", "text_color", "text_rgb",
+                 "dirty_rects", "render_cache_mb", "prerender_words")
+
+    def __init__(self, flash_duration=0.1, interval=5, font_size=36, text_color="#FFFFFF",
+                 dirty_rects=True, render_cache_mb=64, prerender_words=8):
+        init = object.__setattr__
+        init(self, "flash_duration", float(flash_duration))
+        init(self, "interval", float(interval))
+        init(self, "font_size", int(font_size))
+        init(self, "text_color", text_color)
+        init(self, "text_rgb", parse_color(text_color))
+        init(self, "dirty_rects", bool(dirty_rects))
+        init(self, "render_cache_mb", render_cache_mb)
+        init(self, "prerender_words", int(prerender_words))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("FlashSettings is immutable, use replace()")
+
+    def __delattr__(self, name):
+        raise AttributeError("FlashSettings is immutable")
+
+    def __reduce__(self):
+        # Slots plus a blocked __setattr__ defeat the default pickling
+        return (FlashSettings, tuple(getattr(self, name) for name in self.fields()))
+
+    def __eq__(self, other):
+        if not isinstance(other, FlashSettings):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.fields())
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, name) for name in self.fields()))
+
+    def __repr__(self):
+        return "FlashSettings(" + ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields()) + ")"
+
+    @classmethod
+    def fields(cls):
+        """Constructor arguments, text_rgb is derived from text_color"""
+        return [name for name in cls.__slots__ if name != "text_rgb"]
+
+    def replace(self, **changes):
+        """Return a copy with some fields changed"""
+        values = {name: getattr(self, name) for name in self.fields()}
+        values.update(changes)
+        return FlashSettings(**values)
@@ -0,0 +1,131 @@
+"""Tk dialogs for importing word files, shared by both apps"""
+import os
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+
+def ask_table_options(root, colors, file_path, columns, categories=False):
+    """Ask which columns of a table to import and how to filter them
+
+    Returns StructuredImport keyword arguments, or None if cancelled.
+    With categories=True a column can be picked to split the rows into
+    categories.
+    """
+    dialog = tk.Toplevel(root)
+    dialog.title("Import Table")
+    dialog.configure(bg=colors["bg"])
+    dialog.transient(root)
+    dialog.grab_set()
+
+    form = tk.Frame(dialog, bg=colors["bg"])
+    form.pack(padx=20, pady=15)
+
+    # Guess the word column from common header names
+    guess = next((c for c in columns if c.strip().lower() in ("word", "words", "text", "phrase")), columns[0])
+    word_var = tk.StringVar(value=guess)
+    ttk.Label(form, text="Word column:").grid(row=0, column=0, sticky=tk.W, pady=5)
+    ttk.Combobox(form, textvariable=word_var, values=columns, state="readonly",
+                 width=25).grid(row=0, column=1, pady=5)
+
+    single = "(one category)"
+    category_var = tk.StringVar(value=single)
+    name_var = tk.StringVar(value=os.path.splitext(os.path.basename(file_path))[0])
+    if categories:
+        ttk.Label(form, text="Category column:").grid(row=1, column=0, sticky=tk.W, pady=5)
+        ttk.Combobox(form, textvariable=category_var, values=[single] + columns, state="readonly",
+                     width=25).grid(row=1, column=1, pady=5)
+        ttk.Label(form, text="Category name:").grid(row=2, column=0, sticky=tk.W, pady=5)
+        ttk.Entry(form, textvariable=name_var, width=27).grid(row=2, column=1, pady=5)
+
+    dedupe_var = tk.BooleanVar(value=True)
+    ttk.Checkbutton(form, text="Remove duplicates", variable=dedupe_var).grid(
+        row=3, column=0, columnspan=2, sticky=tk.W, pady=5)
+
+    min_var = tk.IntVar(value=1)
+    max_var = tk.IntVar(value=0)
+    ttk.Label(form, text="Min length:").grid(row=4, column=0, sticky=tk.W, pady=5)
+    ttk.Spinbox(form, from_=1, to=1000, textvariable=min_var, width=8).grid(row=4, column=1, sticky=tk.W)
+    ttk.Label(form, text="Max length (0 = any):").grid(row=5, column=0, sticky=tk.W, pady=5)
+    ttk.Spinbox(form, from_=0, to=1000, textvariable=max_var, width=8).grid(row=5, column=1, sticky=tk.W)
+
+    options = {}
+
+    def accept():
+        try:
+            min_length, max_length = min_var.get(), max_var.get()
+        except tk.TclError:
+            messagebox.showwarning("Invalid", "Lengths must be whole numbers!")
+            return
+        category_column = category_var.get()
+        options.update(
+            word_column=word_var.get(),
+            category_column=None if category_column == single else category_column,
+            default_category=name_var.get().strip() or None,
+            dedupe=dedupe_var.get(),
+            min_length=min_length,
+            max_length=max_length or None
+        )
+        dialog.destroy()
+
+    button_frame = tk.Frame(dialog, bg=colors["bg"])
+    button_frame.pack(pady=(0, 15))
+
+    ttk.Button(button_frame, text="Import", command=accept,
+              style="Accent.TButton").pack(side=tk.LEFT, padx=5)
+    ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+
+    root.wait_window(dialog)
+    return options or None
+
+
+class ImportJobs:
+    """Runs an app's background import jobs, each with a progress dialog
+
+    Jobs are WordFileImport-like objects (start, cancel, done, progress(),
+    words_read). on_status(text) is called with a progress line for the
+    app's status bar while a job runs.
+    """
+
+    def __init__(self, root, colors, on_status):
+        self.root = root
+        self.colors = colors
+        self.on_status = on_status
+        self.jobs = set()  # File imports running in the background
+
+    def run(self, job, on_done):
+        """Run an import job with a progress dialog, on_done(job) is called on the Tk thread"""
+        file_name = os.path.basename(job.path)
+
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Importing")
+        dialog.geometry("400x150")
+        dialog.configure(bg=self.colors["bg"])
+        dialog.transient(self.root)
+
+        progress_label = ttk.Label(dialog, text=f"Reading {file_name}...")
+        progress_label.pack(pady=10)
+        progress_bar = ttk.Progressbar(dialog, length=340, maximum=1.0)
+        progress_bar.pack(pady=5)
+        ttk.Button(dialog, text="Cancel", command=job.cancel).pack(pady=10)
+        dialog.protocol("WM_DELETE_WINDOW", job.cancel)
+
+        def poll():
+            if job.done.is_set():
+                self.jobs.discard(job)
+                dialog.destroy()
+                on_done(job)
+                return
+            progress_bar["value"] = job.progress()
+            progress_label.config(text=f"Reading {file_name}: {job.words_read:,} words")
+            self.on_status(f"Importing {file_name} ({job.progress():.0%})...")
+            self.root.after(100, poll)
+
+        self.jobs.add(job)
+        job.start()
+        poll()
+
+    def cancel_all(self, timeout=2.0):
+        """Cancel background imports and wait for them to finish (and their writes to roll back)"""
+        for job in list(self.jobs):
+            job.cancel()
+            job.done.wait(timeout)
@@ -0,0 +1,51 @@
+"""Startup timings for the --profile-startup option of both apps"""
+import sys
+import time
+
+# Modules that should not be loaded before the first flash
+HEAVY_MODULES = ("pygame", "pandas", "numpy", "flash_engine")
+
+
+class StartupProfile:
+    """Records named moments since the entry script started
+
+    The entry script takes time.perf_counter() before its own imports and
+    passes it in, so the first mark covers them. report() prints each
+    step's time and the total, and which heavy modules were loaded.
+    """
+
+    def __init__(self, started):
+        self.started = started
+        self.marks = []  # (label, perf_counter)
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter()))
+
+    def report(self, out=None):
+        out = out or sys.stdout
+        print("Startup profile:", file=out)
+        previous = self.started
+        for label, at in self.marks:
+            print(f"  {label:<16}{(at - previous) * 1000:8.1f} ms  (total {(at - self.started) * 1000:7.1f} ms)",
+                  file=out)
+            previous = at
+        loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+        print(f"  heavy modules loaded: {', '.join(loaded) if loaded else 'none'}", file=out)
+
+
+def profile_window(root, profile, close):
+    """Mark the first paint and the first idle moment of root, then report and close
+
+    close is the app's normal shutdown, so profiling leaves the library and
+    settings as a normal run would.
+    """
+    profile.mark("window built")
+    root.update()
+    profile.mark("first paint")
+
+    def interactive():
+        profile.mark("interactive")
+        profile.report()
+        close()
+
+    root.after_idle(interactive)
@@ -1,12 +1,18 @@
+import time
+_started = time.perf_counter()  # For --profile-startup, before the imports below
+
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, colorchooser
-import pandas as pd
-import pygame
-import threading
-import time
+import argparse
 import json
 import os
 from pathlib import Path
+from flash_settings import FlashSettings
+from word_source import WordSource
+from import_dialog import ImportJobs, ask_table_options
+from word_view import PagedWordView
+from startup_profile import StartupProfile, profile_window
+from word_library import WordFileImport, StructuredImport, read_columns, structured_format, write_json_atomic
 
 class SubliminalApp:
     def __init__(self, root):
@@ -35,16 +41,26 @@ class SubliminalApp:
             "font_size": 36,
             "text_color": "#FFFFFF",
             "bg_color": "#000000",
-            "opacity": 0.8
+            "opacity": 0.8,
+            "render_cache_mb": 64,  # memory budget for rendered words
+            "prerender_words": 8,   # words rasterized ahead of time
+            "dirty_rects": True,    # redraw only the word area instead of the full screen
+            "process_renderer": False  # flash from a child process instead of a thread
         }
 
         # Categories and words
         self.categories = {}  # {category_name: [words]}
         self.selected_categories = set()  # Set of selected category names
-        self.words = []
-        self.current_word_index = 0
+        self.word_source = WordSource()  # Active words, shared with the renderer
         self.is_running = False
-        self.flash_thread = None
+        # File imports running in the background
+        self.imports = ImportJobs(self.root, self.colors, lambda text: self.status_label.config(text=text))
+
+        # Created on first start, then kept across start/stop
+        self.renderer = None
+
+        # Immutable snapshot handed to the renderer, rebuilt when a setting changes
+        self.flash_settings = FlashSettings()
 
         self.setup_modern_ui()
         self.load_settings()
@@ -186,6 +202,21 @@ class SubliminalApp:
                  orient=tk.HORIZONTAL, command=self.update_opacity_label).grid(row=5, column=1, sticky=(tk.W, tk.E))
         self.opacity_label = ttk.Label(settings_frame, text=f"{self.settings['opacity']:.1f}")
         self.opacity_label.grid(row=5, column=2, padx=5)
+
+        # Presentation mode
+        self.dirty_rects_var = tk.BooleanVar(value=self.settings["dirty_rects"])
+        ttk.Checkbutton(settings_frame, text="Redraw only the word area (dirty rectangles)",
+                       variable=self.dirty_rects_var).grid(row=6, column=0, columnspan=3, sticky=tk.W)
+
+        # Renderer placement (applies on next start)
+        self.process_renderer_var = tk.BooleanVar(value=self.settings["process_renderer"])
+        ttk.Checkbutton(settings_frame, text="Run renderer in a separate process",
+                       variable=self.process_renderer_var).grid(row=7, column=0, columnspan=3, sticky=tk.W)
+
+        # Push a new settings snapshot to the renderer whenever one of these moves
+        for var in (self.duration_var, self.interval_var, self.font_size_var,
+                    self.text_color_var, self.dirty_rects_var):
+            var.trace_add("write", self.on_setting_changed)
         
         # Control buttons
         control_frame = ttk.Frame(main_frame)
@@ -214,9 +245,23 @@ class SubliminalApp:
         self.words_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
 
+        # Only one page of words is put into the text widget at a time
+        page_frame = ttk.Frame(preview_frame)
+        page_frame.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E))
+        page_frame.columnconfigure(1, weight=1)
+
+        ttk.Button(page_frame, text="◀", width=3,
+                   command=lambda: self.word_view.previous_page()).grid(row=0, column=0)
+        self.page_label = ttk.Label(page_frame, text="No words")
+        self.page_label.grid(row=0, column=1)
+        ttk.Button(page_frame, text="▶", width=3,
+                   command=lambda: self.word_view.next_page()).grid(row=0, column=2)
+
+        self.word_view = PagedWordView(self.words_text, on_page=self.update_page_label)
+
         # Button to update words from edited text
         update_button = ttk.Button(preview_frame, text="Update Words from Text", command=self.update_words_from_text)
-        update_button.grid(row=1, column=0, columnspan=2, pady=5)
+        update_button.grid(row=2, column=0, columnspan=2, pady=5)
         
         # Configure grid weights
         self.root.columnconfigure(0, weight=1)
@@ -260,51 +305,72 @@ class SubliminalApp:
     def load_csv(self):
         file_path = filedialog.askopenfilename(
             title="Select CSV file",
-            filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[("CSV files", "*.csv"), ("Text files", "*.txt"), ("TSV files", "*.tsv"),
+                       ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
         )
 
         if file_path:
+            # Multi-column tables and JSONL import one chosen column instead of raw lines
+            fmt = structured_format(file_path)
+            columns = []
+            if fmt:
+                try:
+                    columns = read_columns(file_path, fmt)
+                except Exception:
+                    pass  # Not a parseable table, read it line by line
+            structured = len(columns) > 1 or (fmt == "jsonl" and columns)
+            if structured:
+                options = ask_table_options(self.root, self.colors, file_path, columns)
+                if options is None:
+                    return
+
+            def finished(job):
+                if job.cancelled:
+                    self.status_label.config(text="Import cancelled (kept previous list)")
+                elif job.error is not None:
+                    messagebox.showerror("Error", f"Failed to load CSV file: {str(job.error)}")
+                else:
+                    # Start from the beginning of the new list
+                    self.set_words(job.result, index=0)
+                    self.file_label.config(text=os.path.basename(file_path))
+                    self.update_words_preview()
+                    self.status_label.config(text=f"Loaded {len(self.words)} words (replaced previous list)")
+
             try:
-                # Stop flashing if currently running
-                if self.is_running:
-                    self.stop_flashing()
-
-                # Read file as newline-delimited text
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                # Remove empty lines and strip whitespace
-                self.words = [line.strip() for line in lines if line.strip()]
-
-                # Reset word index to start from beginning
-                self.current_word_index = 0
-                self.file_label.config(text=os.path.basename(file_path))
-                self.update_words_preview()
-                self.status_label.config(text=f"Loaded {len(self.words)} words (replaced previous list)")
+                if structured:
+                    # Without a category column everything lands in a single category
+                    job = StructuredImport(file_path, lambda categories: next(iter(categories.values()), []),
+                                           **options)
+                else:
+                    # Read file as newline-delimited text, stripped and without empty lines
+                    job = WordFileImport(file_path, list)
+                self.imports.run(job, finished)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to load CSV file: {str(e)}")
-                
+
+    @property
+    def words(self):
+        return self.word_source.words
+
+    def set_words(self, words, index=None):
+        # Swapped atomically, a running renderer uses the new list from the next flash
+        self.word_source.swap(words, index)
+        if self.renderer is not None:
+            self.renderer.words_changed(index)
+
     def update_words_preview(self):
-        self.words_text.delete(1.0, tk.END)
-        if self.words:
-            preview = "\n".join(self.words)  # Show all words
-            self.words_text.insert(1.0, preview)
+        # Renders the first page only, whatever the size of the list
+        self.word_view.set_words(self.words)
+
+    def update_page_label(self):
+        self.page_label.config(text=self.word_view.describe())
 
     def update_words_from_text(self):
         """Update the word list from the edited text in the preview window"""
         try:
-            # Stop flashing if currently running
-            if self.is_running:
-                self.stop_flashing()
-
-            # Get text from the text widget
-            text_content = self.words_text.get(1.0, tk.END)
-
-            # Split by newlines and remove empty lines
-            self.words = [line.strip() for line in text_content.split('\n') if line.strip()]
-
-            # Reset word index
-            self.current_word_index = 0
+            # Words with the edits of every visited page applied, flashing carries on with the new list
+            self.set_words(self.word_view.get_words(), index=0)
+            self.word_view.saved()
 
             # Update status
             self.status_label.config(text=f"Updated to {len(self.words)} words from edited text")
@@ -313,6 +379,49 @@ class SubliminalApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update words: {str(e)}")
             
+    def ensure_renderer(self):
+        # pygame is only loaded once flashing starts, not at startup
+        from flash_engine import RenderCache, RenderSession, ProcessRenderer
+
+        use_process = self.process_renderer_var.get()
+        if self.renderer is not None and isinstance(self.renderer, ProcessRenderer) == use_process:
+            return
+
+        if self.renderer is not None:
+            self.renderer.close()
+        if use_process:
+            # Flash timing runs in its own process, away from the Tk thread's GIL
+            self.renderer = ProcessRenderer(self.word_source, "Subliminal Messages", self.flash_settings)
+        else:
+            # The flash window, fonts and rendered words are kept across start/stop
+            self.renderer = RenderSession(self.word_source, "Subliminal Messages",
+                                          RenderCache(self.settings["render_cache_mb"] * 1024 * 1024),
+                                          self.flash_settings)
+
+    def on_setting_changed(self, *args):
+        # Rebuild the snapshot and hand it to the renderer, but only if something changed
+        try:
+            settings = self.build_flash_settings()
+        except (tk.TclError, ValueError):
+            return  # Half-typed value, keep the previous snapshot
+        if settings == self.flash_settings:
+            return
+        self.flash_settings = settings
+        if self.renderer is not None:
+            self.renderer.update_settings(settings)
+
+    def build_flash_settings(self):
+        # Tk thread only - the renderer never reads Tk variables itself
+        return FlashSettings(
+            flash_duration=self.duration_var.get(),
+            interval=self.interval_var.get(),
+            font_size=self.font_size_var.get(),
+            text_color=self.text_color_var.get(),
+            dirty_rects=self.dirty_rects_var.get(),
+            render_cache_mb=self.settings["render_cache_mb"],
+            prerender_words=self.settings["prerender_words"]
+        )
+
     def get_current_settings(self):
         return {
             "flash_duration": self.duration_var.get(),
@@ -320,7 +429,9 @@ class SubliminalApp:
             "font_size": self.font_size_var.get(),
             "text_color": self.text_color_var.get(),
             "bg_color": self.bg_color_var.get(),
-            "opacity": self.opacity_var.get()
+            "opacity": self.opacity_var.get(),
+            "dirty_rects": self.dirty_rects_var.get(),
+            "process_renderer": self.process_renderer_var.get()
         }
         
     def start_flashing(self):
@@ -335,132 +446,21 @@ class SubliminalApp:
         # Minimize the main window
         self.root.iconify()
         
-        # Start flashing in a separate thread
-        self.flash_thread = threading.Thread(target=self.flash_loop, daemon=True)
-        self.flash_thread.start()
+        # The render session is created on first start and reused afterwards
+        self.ensure_renderer()
+        self.renderer.start()
         
     def stop_flashing(self):
         self.is_running = False
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
+        if self.renderer is not None:
+            self.renderer.stop()
+            self.status_label.config(text="Stopped - " + " | ".join(self.renderer.describe()))
         
         # Restore the main window
         self.root.deiconify()
         
-    def flash_loop(self):
-        pygame.init()
-
-        # Get screen info and create fullscreen window
-        screen_info = pygame.display.Info()
-        screen_width, screen_height = screen_info.current_w, screen_info.current_h
-
-        # Create a borderless window that covers the entire screen
-        screen = pygame.display.set_mode((screen_width, screen_height), pygame.NOFRAME)
-        pygame.display.set_caption("Subliminal Messages")
-
-        # Set a color key for transparency (magenta is commonly used)
-        transparent_color = (255, 0, 255)
-
-        # Make the window always on top and set layered window attributes for transparency (Windows)
-        try:
-            import ctypes
-            hwnd = pygame.display.get_wm_info()["window"]
-
-            # Windows API constants
-            GWL_EXSTYLE = -20
-            WS_EX_LAYERED = 0x00080000
-            WS_EX_TOPMOST = 0x00000008
-            WS_EX_TRANSPARENT = 0x00000020
-            LWA_COLORKEY = 0x00000001
-            HWND_TOPMOST = -1
-            SWP_NOMOVE = 0x0002
-            SWP_NOSIZE = 0x0001
-            SWP_SHOWWINDOW = 0x0040
-
-            # Get current extended style
-            ex_style = ctypes.windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
-
-            # Add layered, topmost, and transparent (click-through) styles
-            new_ex_style = ex_style | WS_EX_LAYERED | WS_EX_TOPMOST | WS_EX_TRANSPARENT
-            ctypes.windll.user32.SetWindowLongW(hwnd, GWL_EXSTYLE, new_ex_style)
-
-            # Set the transparent color key
-            ctypes.windll.user32.SetLayeredWindowAttributes(hwnd,
-                ctypes.c_ulong(transparent_color[2] << 16 | transparent_color[1] << 8 | transparent_color[0]),
-                0, LWA_COLORKEY)
-
-            # Set window to always on top
-            ctypes.windll.user32.SetWindowPos(hwnd, HWND_TOPMOST, 0, 0, 0, 0,
-                                             SWP_NOMOVE | SWP_NOSIZE | SWP_SHOWWINDOW)
-        except:
-            pass  # Fallback if we can't set transparency
-
-        clock = pygame.time.Clock()
-
-        # Fill screen with transparent color initially
-        screen.fill(transparent_color)
-        pygame.display.flip()
-
-        while self.is_running and self.words:
-            settings = self.get_current_settings()
-
-            # Get current word
-            word = self.words[self.current_word_index]
-            self.current_word_index = (self.current_word_index + 1) % len(self.words)
-
-            # Flash the word
-            self.flash_word(screen, screen_width, screen_height, word, settings, transparent_color)
-
-            # Wait for the interval
-            for _ in range(int(settings["interval"] * 10)):
-                if not self.is_running:
-                    break
-                time.sleep(0.1)
-                # Check for events to prevent freezing
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.is_running = False
-                        break
-
-        pygame.quit()
-        
-    def flash_word(self, screen, screen_width, screen_height, word, settings, transparent_color):
-        # Convert hex color to RGB
-        try:
-            text_color = self.hex_to_rgb(settings["text_color"])
-        except:
-            text_color = (255, 255, 255)
-
-        # Create font
-        font = pygame.font.SysFont('Arial', settings["font_size"])
-        text_surface = font.render(word, True, text_color)
-        text_rect = text_surface.get_rect(center=(screen_width//2, screen_height//2))
-
-        # Fill entire screen with transparent color first
-        screen.fill(transparent_color)
-
-        # Display only the text (no background)
-        screen.blit(text_surface, text_rect)
-        pygame.display.flip()
-
-        # Keep displayed for flash duration
-        start_time = time.time()
-        while time.time() - start_time < settings["flash_duration"] and self.is_running:
-            clock = pygame.time.Clock()
-            clock.tick(60)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.is_running = False
-                    break
-
-        # Clear screen with transparent color
-        screen.fill(transparent_color)
-        pygame.display.flip()
-        
-    def hex_to_rgb(self, hex_color):
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
-        
     def load_settings(self):
         try:
             if os.path.exists("subliminal_settings.json"):
@@ -475,29 +475,50 @@ class SubliminalApp:
                 self.text_color_var.set(self.settings["text_color"])
                 self.bg_color_var.set(self.settings["bg_color"])
                 self.opacity_var.set(self.settings["opacity"])
+                self.dirty_rects_var.set(self.settings["dirty_rects"])
+                self.process_renderer_var.set(self.settings["process_renderer"])
                 
                 self.update_duration_label(self.settings["flash_duration"])
                 self.update_interval_label(self.settings["interval"])
                 self.update_font_size_label(self.settings["font_size"])
                 self.update_opacity_label(self.settings["opacity"])
+                self.on_setting_changed()
         except Exception as e:
             print(f"Error loading settings: {e}")
             
     def save_settings(self):
         try:
             self.settings.update(self.get_current_settings())
-            with open("subliminal_settings.json", "w") as f:
-                json.dump(self.settings, f, indent=2)
+            # Replaced in one rename, a crash mid-save keeps the previous file
+            write_json_atomic("subliminal_settings.json", self.settings)
         except Exception as e:
             print(f"Error saving settings: {e}")
             
     def on_closing(self):
         self.stop_flashing()
+        if self.renderer is not None:
+            self.renderer.close()
+        self.imports.cancel_all()
         self.save_settings()
         self.root.destroy()
 
-if __name__ == "__main__":
+
+def main():
+    parser = argparse.ArgumentParser(description="Subliminal Message App (classic)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and first-paint timings, then exit")
+    args = parser.parse_args()
+
+    profile = StartupProfile(_started)
+    profile.mark("imports")
     root = tk.Tk()
+    profile.mark("Tk root")
     app = SubliminalApp(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
-    root.mainloop()
\ No newline at end of file
+    if args.profile_startup:
+        profile_window(root, profile, app.on_closing)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
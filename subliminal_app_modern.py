@@ -1,13 +1,36 @@
-import tkinter as tk
-from tkinter import ttk, filedialog, messagebox, colorchooser
-import pygame
-import threading
 import time
+_started = time.perf_counter()  # For --profile-startup, before the imports below
+
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox, colorchooser, simpledialog
+import argparse
+import itertools
 import json
 import os
+import threading
 from pathlib import Path
+from flash_settings import FlashSettings
+from word_source import (WordSource, ChainedWords, UniqueWords, SequentialOrder, ShuffledOrder, PermutedOrder, ReservoirOrder,
+                         WeightedOrder, SpacedRepetitionOrder)
+from word_file import FileWords, FileIndexJob
+from word_pool import WordPool
+from word_journal import JournaledStore
+from import_dialog import ImportJobs, ask_table_options
+from word_view import PagedWordView, CategoryListModel
+from startup_profile import StartupProfile, profile_window
+from word_library import (CategoryStore, WordFileImport, BulkImport, StructuredImport, SETTINGS_FILE,
+                          category_name_for, find_word_files, read_columns)
 
 class SubliminalApp:
+    # Word orders offered in the settings panel, keyed by their settings name
+    ORDER_LABELS = {
+        "sequential": "In order",
+        "shuffle": "Shuffle",
+        "reservoir": "Random samples",
+        "weighted": "Weighted categories",
+        "spaced": "Spaced repetition"
+    }
+
     def __init__(self, root):
         self.root = root
         self.root.title("Subliminal Message App - Modern")
@@ -33,16 +56,33 @@ class SubliminalApp:
             "flash_duration": 0.1,
             "interval": 5,
             "font_size": 36,
-            "text_color": "#FFFFFF"
+            "text_color": "#FFFFFF",
+            "render_cache_mb": 64,
+            "prerender_words": 8,
+            "dirty_rects": True,
+            "process_renderer": False,
+            "word_order": "sequential",
+            "order_seed": "",
+            "category_weights": {},
+            "dedupe_selection": False
         }
 
         # Categories and words
-        self.categories = {}  # {category_name: [words]}
+        # {category_name: [words]}; loaded words are interned in one pool and
+        # changes (and settings) are saved by a background journal writer
+        self.categories = JournaledStore(CategoryStore(pool=WordPool()))
+        self.autosave = False  # Settings are saved on change once they have been loaded
         self.selected_categories = set()  # Set of selected category names
-        self.words = []
-        self.current_word_index = 0
+        self.word_source = WordSource()  # Active words, shared with the renderer
         self.is_running = False
-        self.flash_thread = None
+        # File imports running in the background
+        self.imports = ImportJobs(self.root, self.colors, lambda text: self.status_label.config(text=text))
+
+        # Created on first start, then kept across start/stop
+        self.renderer = None
+
+        # Immutable snapshot handed to the renderer, rebuilt when a setting changes
+        self.flash_settings = FlashSettings()
 
         self.setup_modern_ui()
         self.load_settings()
@@ -93,9 +133,29 @@ class SubliminalApp:
                   command=self.add_category).pack(side=tk.LEFT, padx=(0, 5))
         ttk.Button(cat_button_frame, text="📂 Load from File",
                   command=self.load_category_from_file).pack(side=tk.LEFT, padx=5)
+        ttk.Button(cat_button_frame, text="📚 Import Folder",
+                  command=self.import_folder).pack(side=tk.LEFT, padx=5)
+        ttk.Button(cat_button_frame, text="🧾 Import Table",
+                  command=self.import_table).pack(side=tk.LEFT, padx=5)
+        ttk.Button(cat_button_frame, text="📄 Flash File",
+                  command=self.flash_from_file).pack(side=tk.LEFT, padx=5)
+        ttk.Button(cat_button_frame, text="🔎 Find Word",
+                  command=self.find_word).pack(side=tk.LEFT, padx=5)
+        ttk.Button(cat_button_frame, text="⚖️ Weight",
+                  command=self.set_category_weight).pack(side=tk.LEFT, padx=5)
         ttk.Button(cat_button_frame, text="🗑️ Delete",
                   command=self.delete_category, style="Danger.TButton").pack(side=tk.LEFT, padx=5)
 
+        # Type-ahead filter over category names
+        self.category_filter_var = tk.StringVar()
+        filter_frame = tk.Frame(category_frame, bg=self.colors["bg"])
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+        ttk.Label(filter_frame, text="🔍").pack(side=tk.LEFT, padx=(0, 5))
+        tk.Entry(filter_frame, textvariable=self.category_filter_var, font=("Segoe UI", 10),
+                 bg=self.colors["surface"], fg=self.colors["fg"], borderwidth=0,
+                 insertbackground=self.colors["primary"]).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.category_filter_var.trace_add("write", self.on_category_filter)
+
         # Category list with checkboxes
         cat_list_frame = tk.Frame(category_frame, bg=self.colors["surface"], relief=tk.FLAT, bd=2)
         cat_list_frame.pack(fill=tk.BOTH, expand=True)
@@ -109,11 +169,15 @@ class SubliminalApp:
                                           font=("Segoe UI", 11), borderwidth=0,
                                           highlightthickness=0, selectbackground=self.colors["primary"],
                                           selectforeground="#000000",
-                                          yscrollcommand=cat_scrollbar.set, activestyle='none')
+                                          yscrollcommand=cat_scrollbar.set, activestyle='none',
+                                          exportselection=False)
         self.category_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         cat_scrollbar.config(command=self.category_listbox.yview)
         self.category_listbox.bind('<<ListboxSelect>>', self.on_category_select)
 
+        # Keeps the listbox rows sorted and filtered, applying single row changes
+        self.category_model = CategoryListModel(self.category_listbox)
+
         # Words in selected categories
         words_frame = ttk.LabelFrame(left_panel, text="📝 Words in Selected Categories", padding="15")
         words_frame.pack(fill=tk.BOTH, expand=True)
@@ -132,6 +196,20 @@ class SubliminalApp:
         self.words_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True, padx=10, pady=10)
         words_scrollbar.config(command=self.words_text.yview)
 
+        # Only one page of words is put into the text widget at a time
+        page_frame = tk.Frame(words_frame, bg=self.colors["bg"])
+        page_frame.pack(fill=tk.X, pady=(5, 0))
+
+        ttk.Button(page_frame, text="◀", width=3,
+                  command=lambda: self.word_view.previous_page()).pack(side=tk.LEFT)
+        self.page_label = tk.Label(page_frame, text="No words", bg=self.colors["bg"],
+                                   fg=self.colors["fg"], font=("Segoe UI", 9))
+        self.page_label.pack(side=tk.LEFT, expand=True)
+        ttk.Button(page_frame, text="▶", width=3,
+                  command=lambda: self.word_view.next_page()).pack(side=tk.RIGHT)
+
+        self.word_view = PagedWordView(self.words_text, on_page=self.update_page_label)
+
         # Update button
         ttk.Button(words_frame, text="✓ Update Active Words",
                   command=self.update_words_from_text, style="Accent.TButton").pack(pady=(10, 0), fill=tk.X)
@@ -193,8 +271,53 @@ class SubliminalApp:
 
         ttk.Button(color_container, text="Choose Color", command=choose_color).pack(side=tk.LEFT)
 
+        # Presentation mode
+        self.dirty_rects_var = tk.BooleanVar(value=self.settings["dirty_rects"])
+        tk.Checkbutton(settings_frame, text="🖼️ Redraw only the word area (dirty rectangles)",
+                      variable=self.dirty_rects_var, bg=self.colors["bg"], fg=self.colors["fg"],
+                      selectcolor=self.colors["surface"], activebackground=self.colors["bg"],
+                      activeforeground=self.colors["fg"], font=("Segoe UI", 10),
+                      highlightthickness=0).grid(row=4, column=0, columnspan=2, sticky=tk.W, pady=(5, 0))
+
+        # Renderer placement (applies on next start)
+        self.process_renderer_var = tk.BooleanVar(value=self.settings["process_renderer"])
+        tk.Checkbutton(settings_frame, text="🧵 Run renderer in a separate process",
+                      variable=self.process_renderer_var, bg=self.colors["bg"], fg=self.colors["fg"],
+                      selectcolor=self.colors["surface"], activebackground=self.colors["bg"],
+                      activeforeground=self.colors["fg"], font=("Segoe UI", 10), highlightthickness=0,
+                      command=self.settings_changed).grid(row=5, column=0, columnspan=2, sticky=tk.W)
+
+        # Word order, with an optional seed for reproducible shuffles
+        ttk.Label(settings_frame, text="🔀 Word Order:").grid(row=6, column=0, sticky=tk.W, pady=10, padx=(0, 10))
+        order_container = tk.Frame(settings_frame, bg=self.colors["bg"])
+        order_container.grid(row=6, column=1, sticky=(tk.W, tk.E), pady=10)
+
+        self.word_order_var = tk.StringVar(value=self.ORDER_LABELS[self.settings["word_order"]])
+        ttk.Combobox(order_container, textvariable=self.word_order_var, state="readonly", width=18,
+                     values=list(self.ORDER_LABELS.values())).pack(side=tk.LEFT, padx=(0, 10))
+        ttk.Label(order_container, text="Seed:").pack(side=tk.LEFT, padx=(0, 5))
+        self.order_seed_var = tk.StringVar(value=self.settings["order_seed"])
+        tk.Entry(order_container, textvariable=self.order_seed_var, width=10, font=("Segoe UI", 10),
+                 bg=self.colors["surface"], fg=self.colors["fg"], borderwidth=0,
+                 insertbackground=self.colors["primary"]).pack(side=tk.LEFT)
+        self.word_order_var.trace_add("write", self.on_order_changed)
+        self.order_seed_var.trace_add("write", self.on_seed_changed)
+
+        # Combined selections can repeat a word that is in several categories
+        self.dedupe_selection_var = tk.BooleanVar(value=self.settings["dedupe_selection"])
+        tk.Checkbutton(settings_frame, text="🧹 Skip repeated words when combining categories",
+                      variable=self.dedupe_selection_var, bg=self.colors["bg"], fg=self.colors["fg"],
+                      selectcolor=self.colors["surface"], activebackground=self.colors["bg"],
+                      activeforeground=self.colors["fg"], font=("Segoe UI", 10), highlightthickness=0,
+                      command=self.on_dedupe_changed).grid(row=7, column=0, columnspan=2, sticky=tk.W)
+
         settings_frame.columnconfigure(1, weight=1)
 
+        # Push a new settings snapshot to the renderer whenever one of these moves
+        for var in (self.flash_duration_var, self.interval_var, self.font_size_var,
+                    self.text_color_var, self.dirty_rects_var):
+            var.trace_add("write", self.on_setting_changed)
+
         # Control buttons
         control_frame = ttk.LabelFrame(right_panel, text="🎮 Controls", padding="15")
         control_frame.pack(fill=tk.X, pady=(0, 10))
@@ -248,7 +371,7 @@ class SubliminalApp:
                     messagebox.showwarning("Duplicate", f"Category '{name}' already exists!")
                 else:
                     self.categories[name] = []
-                    self.update_category_list()
+                    self.category_model.add(name)
                     self.update_status()
                     dialog.destroy()
             else:
@@ -271,74 +394,261 @@ class SubliminalApp:
         )
 
         if file_path:
-            try:
-                # Read file as newline-delimited text
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-
-                # Remove empty lines and strip whitespace
-                words = [line.strip() for line in lines if line.strip()]
-
-                if not words:
-                    messagebox.showwarning("Empty File", "The selected file contains no words!")
-                    return
-
-                # Ask for category name
-                category_name = os.path.splitext(os.path.basename(file_path))[0]
-
-                dialog = tk.Toplevel(self.root)
-                dialog.title("Name Category")
-                dialog.geometry("400x150")
-                dialog.configure(bg=self.colors["bg"])
-                dialog.transient(self.root)
-                dialog.grab_set()
-
-                ttk.Label(dialog, text="Category Name:").pack(pady=10)
-
-                name_entry = tk.Entry(dialog, font=("Segoe UI", 11), width=30)
-                name_entry.insert(0, category_name)
-                name_entry.pack(pady=5)
-                name_entry.focus()
-                name_entry.select_range(0, tk.END)
-
-                def save_category():
-                    name = name_entry.get().strip()
-                    if name:
-                        if name in self.categories:
-                            result = messagebox.askyesno("Duplicate",
-                                f"Category '{name}' already exists! Replace it?")
-                            if not result:
-                                return
-
-                        self.categories[name] = words
-                        self.update_category_list()
-                        self.update_status()
-                        self.status_label.config(text=f"Loaded category '{name}' with {len(words)} words")
-                        dialog.destroy()
-                    else:
-                        messagebox.showwarning("Invalid", "Please enter a category name!")
-
-                button_frame = tk.Frame(dialog, bg=self.colors["bg"])
-                button_frame.pack(pady=15)
-
-                ttk.Button(button_frame, text="Save", command=save_category,
-                          style="Accent.TButton").pack(side=tk.LEFT, padx=5)
-                ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
-
-                name_entry.bind('<Return>', lambda e: save_category())
+            # Ask for category name
+            category_name = os.path.splitext(os.path.basename(file_path))[0]
+
+            dialog = tk.Toplevel(self.root)
+            dialog.title("Name Category")
+            dialog.geometry("400x150")
+            dialog.configure(bg=self.colors["bg"])
+            dialog.transient(self.root)
+            dialog.grab_set()
+
+            ttk.Label(dialog, text="Category Name:").pack(pady=10)
+
+            name_entry = tk.Entry(dialog, font=("Segoe UI", 11), width=30)
+            name_entry.insert(0, category_name)
+            name_entry.pack(pady=5)
+            name_entry.focus()
+            name_entry.select_range(0, tk.END)
+
+            def save_category():
+                name = name_entry.get().strip()
+                if name:
+                    if name in self.categories:
+                        result = messagebox.askyesno("Duplicate",
+                            f"Category '{name}' already exists! Replace it?")
+                        if not result:
+                            return
 
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+                    dialog.destroy()
+                    self.import_category(file_path, name)
+                else:
+                    messagebox.showwarning("Invalid", "Please enter a category name!")
+
+            button_frame = tk.Frame(dialog, bg=self.colors["bg"])
+            button_frame.pack(pady=15)
+
+            ttk.Button(button_frame, text="Save", command=save_category,
+                      style="Accent.TButton").pack(side=tk.LEFT, padx=5)
+            ttk.Button(button_frame, text="Cancel", command=dialog.destroy).pack(side=tk.LEFT, padx=5)
+
+            name_entry.bind('<Return>', lambda e: save_category())
+
+    def import_category(self, file_path, name):
+        """Stream a word file into a category in the background"""
+        def consume(words):
+            # Leave the library untouched if the file has no words
+            first = next(words, None)
+            if first is None:
+                return 0
+            # Streamed straight into the library, bypassing the journal
+            self.categories.update_many({name: itertools.chain([first], words)})
+            return self.categories.count(name)
+
+        def finished(job):
+            if job.cancelled:
+                self.status_label.config(text=f"Import of '{name}' cancelled")
+            elif job.error is not None:
+                messagebox.showerror("Error", f"Failed to load file: {str(job.error)}")
+            elif not job.result:
+                messagebox.showwarning("Empty File", "The selected file contains no words!")
+            else:
+                self.category_model.add(name)
+                if name in self.selected_categories:
+                    self.update_words_display()
+                self.update_status()
+                self.status_label.config(text=f"Loaded category '{name}' with {job.result} words")
+
+        try:
+            self.imports.run(WordFileImport(file_path, consume), finished)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+
+    def import_folder(self):
+        """Import every .txt/.csv file in a folder as its own category"""
+        folder = filedialog.askdirectory(title="Select folder of word lists")
+        if folder:
+            self.bulk_import(folder)
+
+    def bulk_import(self, pattern):
+        """Parse a folder or glob of word files in parallel and add them in one batch"""
+        paths = find_word_files(pattern)
+        if not paths:
+            messagebox.showwarning("No Files", f"No .txt or .csv files found in {pattern}")
+            return
+
+        existing = {category_name_for(path) for path in paths if category_name_for(path) in self.categories}
+        if existing:
+            result = messagebox.askyesnocancel("Duplicate",
+                f"{len(existing)} of these categories already exist. Replace them?\n\n"
+                "No keeps the existing categories and skips those files.")
+            if result is None:
+                return
+            if not result:
+                paths = [path for path in paths if category_name_for(path) not in existing]
+
+        try:
+            self.imports.run(BulkImport(pattern, self.add_categories, paths), self.categories_imported)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import folder: {str(e)}")
+
+    def import_table(self):
+        """Import a column of a CSV/TSV/JSONL file, optionally split into categories by another column"""
+        file_path = filedialog.askopenfilename(
+            title="Select table file",
+            filetypes=[("Tables", "*.csv *.tsv *.jsonl"), ("CSV files", "*.csv"), ("TSV files", "*.tsv"),
+                       ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+        )
+        if not file_path:
+            return
+
+        try:
+            columns = read_columns(file_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read columns: {str(e)}")
+            return
+        if not columns:
+            messagebox.showwarning("Empty File", "The selected file has no columns!")
+            return
+
+        options = ask_table_options(self.root, self.colors, file_path, columns, categories=True)
+        if options is None:
+            return
+
+        try:
+            self.imports.run(StructuredImport(file_path, self.add_categories, **options), self.categories_imported)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to load file: {str(e)}")
+
+    def add_categories(self, categories):
+        """Add or replace {name: words} in one transaction, runs on an import's worker thread"""
+        self.categories.update_many(categories)
+        return {name: len(words) for name, words in categories.items()}
+
+    def categories_imported(self, job):
+        """Refresh once after a batch import has finished"""
+        if job.cancelled:
+            self.status_label.config(text="Import cancelled, nothing was added")
+        elif job.error is not None:
+            messagebox.showerror("Error", f"Failed to import: {str(job.error)}")
+        elif not job.result:
+            messagebox.showwarning("Empty File", "No words were found to import!")
+        else:
+            for name in job.result:
+                self.category_model.add(name)
+            if self.selected_categories & set(job.result):
+                self.update_words_display()
+            self.update_status()
+            text = f"Imported {len(job.result)} categories with {sum(job.result.values())} words"
+            if job.skipped:
+                text += f" ({len(job.skipped)} unreadable files skipped)"
+            self.status_label.config(text=text)
+
+    def find_word(self):
+        """Search every category for a word and jump to the categories holding it"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("Find Word")
+        dialog.geometry("500x420")
+        dialog.configure(bg=self.colors["bg"])
+        dialog.transient(self.root)
+
+        query_var = tk.StringVar()
+        prefix_var = tk.BooleanVar(value=False)
+        search_frame = tk.Frame(dialog, bg=self.colors["bg"])
+        search_frame.pack(fill=tk.X, padx=15, pady=(15, 5))
+        query_entry = tk.Entry(search_frame, textvariable=query_var, font=("Segoe UI", 11),
+                               bg=self.colors["surface"], fg=self.colors["fg"], borderwidth=0,
+                               insertbackground=self.colors["primary"])
+        query_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        query_entry.focus()
+        tk.Checkbutton(search_frame, text="Starts with", variable=prefix_var, bg=self.colors["bg"],
+                      fg=self.colors["fg"], selectcolor=self.colors["surface"],
+                      activebackground=self.colors["bg"], activeforeground=self.colors["fg"],
+                      highlightthickness=0).pack(side=tk.LEFT, padx=(10, 0))
+
+        results = tk.Listbox(dialog, bg=self.colors["surface"], fg=self.colors["fg"], font=("Segoe UI", 10),
+                             borderwidth=0, highlightthickness=0, selectbackground=self.colors["primary"],
+                             selectforeground="#000000", exportselection=False)
+        results.pack(fill=tk.BOTH, expand=True, padx=15, pady=5)
+        found_label = ttk.Label(dialog, text="Type to search all categories (one or two letters match word starts)", wraplength=460)
+        found_label.pack(padx=15, pady=5, anchor=tk.W)
+
+        matches = []   # [(word, uses)] shown in results
+        holding = []   # Categories containing the selected word
+        pending = []   # after() id of the debounced search
+
+        def run_search():
+            pending.clear()
+            matches[:] = self.categories.search(query_var.get().strip(), limit=200, prefix=prefix_var.get())
+            results.delete(0, tk.END)
+            for word, uses in matches:
+                results.insert(tk.END, f"{word}   ×{uses}")
+            found_label.config(text=f"{len(matches)} words" + (" (first 200)" if len(matches) == 200 else ""))
+
+        def on_query(*args):
+            # Wait for a pause in typing instead of searching on every key
+            if pending:
+                self.root.after_cancel(pending.pop())
+            pending.append(self.root.after(150, run_search))
+
+        def on_result(event):
+            selection = results.curselection()
+            if not selection:
+                return
+            holding[:] = self.categories.categories_of(matches[selection[0]][0])
+            found_label.config(text="In: " + ", ".join(holding))
+
+        def select_categories():
+            if not holding:
+                return
+            self.selected_categories = set(holding)
+            self.category_listbox.selection_clear(0, tk.END)
+            self.category_model.select(self.selected_categories)
+            self.update_words_display()
+            self.update_status()
+
+        query_var.trace_add("write", on_query)
+        prefix_var.trace_add("write", on_query)
+        results.bind('<<ListboxSelect>>', on_result)
+        ttk.Button(dialog, text="Select These Categories", command=select_categories,
+                   style="Accent.TButton").pack(pady=(5, 15))
+
+    def flash_from_file(self):
+        """Flash a word file in place, without importing it into the library"""
+        file_path = filedialog.askopenfilename(
+            title="Select word file to flash",
+            filetypes=[("Text files", "*.txt"), ("CSV files", "*.csv"), ("All files", "*.*")]
+        )
+        if file_path:
+            # Only the line index is built (once, kept next to the file)
+            self.imports.run(FileIndexJob(file_path, lambda words: words), self.file_indexed)
+
+    def file_indexed(self, job):
+        """Make an indexed word file the active words"""
+        if job.cancelled:
+            self.status_label.config(text="Indexing cancelled")
+        elif job.error is not None:
+            messagebox.showerror("Error", f"Failed to index file: {str(job.error)}")
+        elif not len(job.result):
+            messagebox.showwarning("Empty File", "No words were found in the file!")
+        else:
+            # The file replaces the category selection until a category is picked again
+            self.selected_categories.clear()
+            self.category_listbox.selection_clear(0, tk.END)
+            self.word_view.set_words(job.result, editable=False)
+            self.set_words(job.result, index=0)
+            self.update_status()
+            self.status_label.config(
+                text=f"Flashing from {os.path.basename(job.path)} ({len(job.result):,} words, not imported)")
 
     def delete_category(self):
         """Delete selected categories"""
-        selected_indices = self.category_listbox.curselection()
-        if not selected_indices:
+        selected_names = self.category_model.selected_names()
+        if not selected_names:
             messagebox.showwarning("No Selection", "Please select categories to delete!")
             return
 
-        selected_names = [self.category_listbox.get(i) for i in selected_indices]
-
         result = messagebox.askyesno("Confirm Delete",
             f"Delete {len(selected_names)} category(ies)?")
 
@@ -348,69 +658,88 @@ class SubliminalApp:
                     del self.categories[name]
                 if name in self.selected_categories:
                     self.selected_categories.remove(name)
+                self.category_model.remove(name)
 
-            self.update_category_list()
             self.update_words_display()
             self.update_status()
 
     def on_category_select(self, event):
         """Handle category selection changes"""
-        selected_indices = self.category_listbox.curselection()
-        self.selected_categories = {self.category_listbox.get(i) for i in selected_indices}
+        # Categories hidden by the filter stay selected
+        hidden = {name for name in self.selected_categories if not self.category_model.is_visible(name)}
+        self.selected_categories = hidden | set(self.category_model.selected_names())
         self.update_words_display()
         self.update_status()
 
-    def update_category_list(self):
-        """Update the category listbox"""
-        self.category_listbox.delete(0, tk.END)
-        for category in sorted(self.categories.keys()):
-            self.category_listbox.insert(tk.END, category)
+    def on_category_filter(self, *args):
+        """Show only the categories whose name contains the filter text"""
+        self.category_model.set_filter(self.category_filter_var.get())
+        self.category_model.select(self.selected_categories)
 
-        # Restore selection
-        for i, category in enumerate(sorted(self.categories.keys())):
-            if category in self.selected_categories:
-                self.category_listbox.selection_set(i)
+    def update_category_list(self):
+        """Rebuild the category listbox from the library"""
+        self.category_model.set_names(self.categories.names())
+        self.category_model.select(self.selected_categories)
 
     def update_words_display(self):
         """Update the words text widget with words from selected categories"""
-        self.words_text.delete(1.0, tk.END)
-
         all_words = []
+        self.categories.pin(self.selected_categories)
 
         # If only one category is selected, show just the words (editable)
         if len(self.selected_categories) == 1:
             category = list(self.selected_categories)[0]
             if category in self.categories:
                 all_words = self.categories[category]
-                self.words_text.insert(1.0, "\n".join(all_words))
-        # If multiple categories selected, show words with category labels
+        # If multiple categories selected, chain their lists without copying them
         elif len(self.selected_categories) > 1:
-            for category in sorted(self.selected_categories):
-                if category in self.categories:
-                    all_words.extend(self.categories[category])
-            self.words_text.insert(1.0, "\n".join(all_words))
-
-        self.words = all_words if all_words else []
+            names = [category for category in sorted(self.selected_categories) if category in self.categories]
+            all_words = ChainedWords([self.categories[category] for category in names], names)
+            if self.dedupe_selection_var.get():
+                self.dedupe_later(all_words)
+
+        # Renders the first page only, whatever the size of the selection
+        self.word_view.set_words(all_words)
+        self.set_words(all_words if all_words else [])
+
+    def dedupe_later(self, words):
+        """Drop repeated words from a combined selection on a worker thread
+
+        Finding them means one pass over every selected word (about 2 s for
+        2M words), so the selection is shown and flashed as it is and the
+        UniqueWords view is swapped in once it is ready, unless the
+        selection changed or its page was edited in the meantime.
+        """
+        result = []
+        thread = threading.Thread(target=lambda: result.append(UniqueWords(words)), daemon=True)
+        thread.start()
+
+        def poll():
+            if thread.is_alive():
+                self.root.after(50, poll)
+            elif result and self.words is words and not self.word_view.modified:
+                self.word_view.set_words(result[0])
+                self.set_words(result[0])
+                self.update_status()
+
+        self.root.after(50, poll)
+
+    def update_page_label(self):
+        self.page_label.config(text=self.word_view.describe())
 
     def update_words_from_text(self):
         """Update the active word list from the edited text and save back to categories"""
         try:
-            # Stop flashing if currently running
-            if self.is_running:
-                self.stop_flashing()
-
-            # Get text from the text widget
-            text_content = self.words_text.get(1.0, tk.END)
-
-            # Split by newlines and remove empty lines
-            new_words = [line.strip() for line in text_content.split('\n') if line.strip()]
+            # Words with the edits of every visited page applied
+            new_words = self.word_view.get_words()
 
             # If we have selected categories, update them with the new words
             if self.selected_categories:
-                # If only one category is selected, save all words to it
+                # If only one category is selected, save the changed lines to it
                 if len(self.selected_categories) == 1:
                     category = list(self.selected_categories)[0]
-                    self.categories[category] = new_words
+                    if self.word_view.modified:
+                        self.categories.splice(category, self.word_view.edits, new_words)
                     self.status_label.config(text=f"Updated category '{category}' with {len(new_words)} words")
                 else:
                     # Multiple categories selected - distribute words evenly or ask user
@@ -419,11 +748,9 @@ class SubliminalApp:
             else:
                 self.status_label.config(text=f"Updated {len(new_words)} active words (no category selected)")
 
-            # Update the active word list
-            self.words = new_words
-
-            # Reset word index
-            self.current_word_index = 0
+            # Swap in the new word list from the start, flashing carries on with it
+            self.set_words(new_words, index=0)
+            self.word_view.saved()
 
             # Update status
             self.update_status()
@@ -431,6 +758,92 @@ class SubliminalApp:
         except Exception as e:
             messagebox.showerror("Error", f"Failed to update words: {str(e)}")
 
+    @property
+    def words(self):
+        """Active word list (read-only snapshot, replace it with set_words)"""
+        return self.word_source.words
+
+    def set_words(self, words, index=None):
+        """Swap the active word list, a running renderer uses it from the next flash"""
+        if isinstance(words, FileWords) != isinstance(self.words, FileWords) and self.word_order() == "shuffle":
+            # Moving between a file and categories changes the kind of shuffle
+            self.word_source.set_order(self.build_order(words), words)
+        else:
+            self.word_source.swap(words, index)
+        if self.renderer is not None:
+            self.renderer.words_changed(index)
+
+    def word_order(self):
+        """Settings name of the order picked in the combobox"""
+        label = self.word_order_var.get()
+        return next((name for name, text in self.ORDER_LABELS.items() if text == label), "sequential")
+
+    def build_order(self, words=None):
+        """Create the selection order picked in the settings panel"""
+        name = self.word_order()
+        seed = self.order_seed_var.get().strip() or None
+        if name == "shuffle":
+            # A file can hold tens of millions of lines, shuffle those in constant memory
+            return PermutedOrder(seed) if isinstance(words, FileWords) else ShuffledOrder(seed)
+        if name == "reservoir":
+            return ReservoirOrder(seed=seed)
+        if name == "weighted":
+            return WeightedOrder(self.settings.get("category_weights", {}), seed)
+        if name == "spaced":
+            return SpacedRepetitionOrder(self.categories.load_exposure())
+        return SequentialOrder()
+
+    def on_order_changed(self, *args):
+        """Switch the active words to the newly picked order"""
+        self.save_exposure()
+        self.word_source.set_order(self.build_order(self.words))
+        if self.renderer is not None:
+            self.renderer.words_changed()
+        self.settings_changed()
+
+    def on_seed_changed(self, *args):
+        """Rebuild the order only if it is one that uses the seed"""
+        if self.word_order() in ("shuffle", "reservoir", "weighted"):
+            self.on_order_changed()
+        else:
+            self.settings_changed()
+
+    def save_exposure(self):
+        """Queue spaced-repetition progress for the library"""
+        order = self.word_source.order
+        if not isinstance(order, SpacedRepetitionOrder):
+            return  # Only spaced repetition keeps progress, don't wait on the renderer for others
+        if self.renderer is not None:
+            order = self.renderer.sync_order()  # The process renderer advances its own copy
+        # The render thread records exposure under the same lock, possibly while we read it
+        with self.word_source.lock:
+            changes = order.take_changes()
+        self.categories.save_exposure(changes)
+
+    def set_category_weight(self):
+        """Set how often the selected categories come up in weighted order"""
+        selection = self.category_model.selected_names()
+        if not selection:
+            messagebox.showwarning("No Selection", "Please select categories to weight!")
+            return
+
+        weights = self.settings.setdefault("category_weights", {})
+        weight = simpledialog.askfloat("Category Weight",
+                                       f"Weight for {', '.join(selection)} (1 = in proportion to size):",
+                                       initialvalue=weights.get(selection[0], 1.0), minvalue=0.0)
+        if weight is None:
+            return
+        for name in selection:
+            if weight == 1.0:
+                weights.pop(name, None)
+            else:
+                weights[name] = weight
+
+        if self.word_order() == "weighted":
+            self.on_order_changed()
+        self.settings_changed()
+        self.status_label.config(text=f"Weight {weight:g} set for {len(selection)} categories")
+
     def update_status(self):
         """Update the status labels"""
         total_cats = len(self.categories)
@@ -442,7 +855,7 @@ class SubliminalApp:
         )
 
     def start_flashing(self):
-        """Start the flashing thread"""
+        """Start (or resume) the render session"""
         if not self.words:
             messagebox.showwarning("No Words", "Please select categories or add words first!")
             return
@@ -452,9 +865,9 @@ class SubliminalApp:
         self.stop_button.config(state=tk.NORMAL)
         self.status_label.config(text=f"Flashing {len(self.words)} words...")
 
-        # Start flashing in a separate thread
-        self.flash_thread = threading.Thread(target=self.flash_loop, daemon=True)
-        self.flash_thread.start()
+        # The render session is created on first start and reused afterwards
+        self.ensure_renderer()
+        self.renderer.start()
 
         # Minimize the main window
         self.root.iconify()
@@ -464,190 +877,183 @@ class SubliminalApp:
         self.is_running = False
         self.start_button.config(state=tk.NORMAL)
         self.stop_button.config(state=tk.DISABLED)
-        self.status_label.config(text="Stopped")
+        if self.renderer is not None:
+            self.renderer.stop()
+            self.save_exposure()
+            self.status_label.config(text="Stopped - " + "\n".join(self.renderer.describe()))
+        else:
+            self.status_label.config(text="Stopped")
 
         # Restore the main window
         self.root.deiconify()
 
-    def flash_loop(self):
-        """Main flashing loop"""
-        pygame.init()
-
-        # Get screen info
-        screen_info = pygame.display.Info()
-        screen_width = screen_info.current_w
-        screen_height = screen_info.current_h
+    def ensure_renderer(self):
+        """Create the renderer, replacing it when the process toggle changed"""
+        # pygame is only loaded once flashing starts, not at startup
+        from flash_engine import RenderCache, RenderSession, ProcessRenderer
 
-        # Create fullscreen window
-        screen = pygame.display.set_mode((screen_width, screen_height), pygame.NOFRAME)
-        pygame.display.set_caption("Subliminal Flash")
-
-        # Set a color key for transparency (magenta is commonly used)
-        transparent_color = (255, 0, 255)
+        use_process = self.process_renderer_var.get()
+        if self.renderer is not None and isinstance(self.renderer, ProcessRenderer) == use_process:
+            return
 
-        # Make the window always on top and set layered window attributes for transparency (Windows)
-        try:
-            import ctypes
-            hwnd = pygame.display.get_wm_info()["window"]
-
-            # Windows API constants
-            GWL_EXSTYLE = -20
-            WS_EX_LAYERED = 0x00080000
-            WS_EX_TOPMOST = 0x00000008
-            WS_EX_TRANSPARENT = 0x00000020
-            LWA_COLORKEY = 0x00000001
-            HWND_TOPMOST = -1
-            SWP_NOMOVE = 0x0002
-            SWP_NOSIZE = 0x0001
-            SWP_SHOWWINDOW = 0x0040
-
-            # Get current extended style
-            ex_style = ctypes.windll.user32.GetWindowLongW(hwnd, GWL_EXSTYLE)
-
-            # Add layered, topmost, and transparent (click-through) styles
-            new_ex_style = ex_style | WS_EX_LAYERED | WS_EX_TOPMOST | WS_EX_TRANSPARENT
-            ctypes.windll.user32.SetWindowLongW(hwnd, GWL_EXSTYLE, new_ex_style)
-
-            # Set the transparent color key
-            ctypes.windll.user32.SetLayeredWindowAttributes(hwnd,
-                ctypes.c_ulong(transparent_color[2] << 16 | transparent_color[1] << 8 | transparent_color[0]),
-                0, LWA_COLORKEY)
-
-            # Set window to always on top
-            ctypes.windll.user32.SetWindowPos(hwnd, HWND_TOPMOST, 0, 0, 0, 0,
-                                             SWP_NOMOVE | SWP_NOSIZE | SWP_SHOWWINDOW)
-        except:
-            pass  # Fallback if we can't set transparency
-
-        # Fill screen with transparent color initially
-        screen.fill(transparent_color)
-        pygame.display.flip()
-
-        # Main loop
-        while self.is_running:
-            # Get current settings
-            settings = {
-                "flash_duration": self.flash_duration_var.get(),
-                "interval": self.interval_var.get(),
-                "font_size": self.font_size_var.get(),
-                "text_color": self.text_color_var.get()
-            }
-
-            # Get next word
-            if self.current_word_index >= len(self.words):
-                self.current_word_index = 0
-
-            word = self.words[self.current_word_index]
-            self.current_word_index += 1
-
-            # Flash the word
-            self.flash_word(screen, screen_width, screen_height, word, settings, transparent_color)
-
-            # Wait for interval
-            start_time = time.time()
-            while time.time() - start_time < settings["interval"] and self.is_running:
-                time.sleep(0.1)
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        self.is_running = False
-                        break
-
-        pygame.quit()
-
-    def flash_word(self, screen, screen_width, screen_height, word, settings, transparent_color):
-        """Flash a single word on screen"""
-        # Convert hex color to RGB
+        if self.renderer is not None:
+            self.renderer.close()
+        if use_process:
+            # Flash timing runs in its own process, away from the Tk thread's GIL
+            self.renderer = ProcessRenderer(self.word_source, "Subliminal Flash", self.flash_settings)
+        else:
+            # The flash window, fonts and rendered words are kept across start/stop
+            self.renderer = RenderSession(self.word_source, "Subliminal Flash",
+                                          RenderCache(self.settings.get("render_cache_mb", 64) * 1024 * 1024),
+                                          self.flash_settings)
+
+    def on_setting_changed(self, *args):
+        """Rebuild the settings snapshot and hand it to the renderer if it changed"""
         try:
-            text_color = self.hex_to_rgb(settings["text_color"])
-        except:
-            text_color = (255, 255, 255)
-
-        # Create font
-        font = pygame.font.SysFont('Arial', settings["font_size"])
-        text_surface = font.render(word, True, text_color)
-        text_rect = text_surface.get_rect(center=(screen_width//2, screen_height//2))
-
-        # Fill entire screen with transparent color first
-        screen.fill(transparent_color)
-
-        # Display only the text (no background)
-        screen.blit(text_surface, text_rect)
-        pygame.display.flip()
-
-        # Keep displayed for flash duration
-        start_time = time.time()
-        while time.time() - start_time < settings["flash_duration"] and self.is_running:
-            clock = pygame.time.Clock()
-            clock.tick(60)
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.is_running = False
-                    break
-
-        # Clear screen with transparent color
-        screen.fill(transparent_color)
-        pygame.display.flip()
-
-    def hex_to_rgb(self, hex_color):
-        """Convert hex color to RGB tuple"""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16) for i in (0, 2, 4))
+            settings = self.build_flash_settings()
+        except (tk.TclError, ValueError):
+            return  # Half-typed value, keep the previous snapshot
+        if settings == self.flash_settings:
+            return
+        self.flash_settings = settings
+        if self.renderer is not None:
+            self.renderer.update_settings(settings)
+        self.settings_changed()
+
+    def on_dedupe_changed(self):
+        self.update_words_display()
+        self.settings_changed()
+
+    def settings_changed(self, *args):
+        """Queue a settings save; the journal writes it after a short pause"""
+        if self.autosave:
+            self.save_settings()
+
+    def build_flash_settings(self):
+        """Snapshot the flash settings from the Tk variables (Tk thread only)"""
+        return FlashSettings(
+            flash_duration=self.flash_duration_var.get(),
+            interval=self.interval_var.get(),
+            font_size=self.font_size_var.get(),
+            text_color=self.text_color_var.get(),
+            dirty_rects=self.dirty_rects_var.get(),
+            render_cache_mb=self.settings.get("render_cache_mb", 64),
+            prerender_words=self.settings.get("prerender_words", 8)
+        )
 
     def load_settings(self):
         """Load settings from file"""
-        settings_file = Path("subliminal_settings.json")
+        settings_file = Path(SETTINGS_FILE)
+
+        # Categories used to live in the settings file, move them to the library once
+        try:
+            migrated = self.categories.migrate_json(settings_file)
+            if migrated:
+                print(f"Moved {migrated} categories from {SETTINGS_FILE} to {self.categories.path}")
+        except Exception as e:
+            print(f"Error migrating categories: {e}")
+
         if settings_file.exists():
             try:
                 with open(settings_file, 'r') as f:
                     data = json.load(f)
                     self.settings = data.get("settings", self.settings)
-                    self.categories = data.get("categories", {})
 
                     # Update UI with loaded settings
                     self.flash_duration_var.set(self.settings.get("flash_duration", 0.1))
                     self.interval_var.set(self.settings.get("interval", 5))
                     self.font_size_var.set(self.settings.get("font_size", 36))
                     self.text_color_var.set(self.settings.get("text_color", "#FFFFFF"))
-
-                    # Update category list
-                    self.update_category_list()
-                    self.update_status()
+                    self.dirty_rects_var.set(self.settings.get("dirty_rects", True))
+                    self.process_renderer_var.set(self.settings.get("process_renderer", False))
+                    self.order_seed_var.set(self.settings.get("order_seed", ""))
+                    self.dedupe_selection_var.set(self.settings.get("dedupe_selection", False))
+                    self.word_order_var.set(self.ORDER_LABELS.get(self.settings.get("word_order"), "In order"))
+                    self.on_setting_changed()
             except Exception as e:
                 print(f"Error loading settings: {e}")
 
+        # Update category list
+        self.update_category_list()
+        self.update_status()
+        self.autosave = True
+
     def save_settings(self):
-        """Save settings to file"""
+        """Queue the settings to be written to file, without waiting for the disk"""
         self.settings = {
             "flash_duration": self.flash_duration_var.get(),
             "interval": self.interval_var.get(),
             "font_size": self.font_size_var.get(),
-            "text_color": self.text_color_var.get()
+            "text_color": self.text_color_var.get(),
+            "render_cache_mb": self.settings.get("render_cache_mb", 64),
+            "prerender_words": self.settings.get("prerender_words", 8),
+            "dirty_rects": self.dirty_rects_var.get(),
+            "process_renderer": self.process_renderer_var.get(),
+            "word_order": self.word_order(),
+            "order_seed": self.order_seed_var.get(),
+            "category_weights": self.settings.get("category_weights", {}),
+            "dedupe_selection": self.dedupe_selection_var.get()
         }
 
+        # Categories are written to the library as they change
         data = {
-            "settings": self.settings,
-            "categories": self.categories
+            "settings": self.settings
         }
 
-        try:
-            with open("subliminal_settings.json", 'w') as f:
-                json.dump(data, f, indent=4)
-        except Exception as e:
-            print(f"Error saving settings: {e}")
+        # Written atomically by the journal's writer thread
+        self.categories.save_settings(data)
+
+def import_library(pattern):
+    """Import a folder or glob of word files into the library without opening the UI"""
+    categories = CategoryStore()
+    try:
+        job = BulkImport(pattern, categories.update_many)
+        if not job.paths:
+            print(f"No .txt or .csv files found in {pattern}")
+            return
+        job.run()
+        if job.error is not None:
+            print(f"Import failed: {job.error}")
+            return
+        for path, error in job.skipped.items():
+            print(f"Skipped {path}: {error}")
+        print(f"Imported {len(job.paths) - len(job.skipped)} files with {job.words_read} words into {categories.path}")
+    finally:
+        categories.close()
 
 def main():
+    parser = argparse.ArgumentParser(description="Subliminal Message App")
+    parser.add_argument("--import", dest="import_path", metavar="DIR_OR_GLOB",
+                        help="import every .txt/.csv file as a category into the library and exit")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print import and first-paint timings, then exit")
+    args = parser.parse_args()
+
+    if args.import_path:
+        import_library(args.import_path)
+        return
+
+    profile = StartupProfile(_started)
+    profile.mark("imports")
     root = tk.Tk()
+    profile.mark("Tk root")
     app = SubliminalApp(root)
 
     # Save settings on close
     def on_closing():
         if app.is_running:
             app.stop_flashing()
-            time.sleep(0.5)
+        app.save_exposure()
+        if app.renderer is not None:
+            app.renderer.close()
+        app.imports.cancel_all()
         app.save_settings()
+        app.categories.close()
         root.destroy()
 
     root.protocol("WM_DELETE_WINDOW", on_closing)
+    if args.profile_startup:
+        profile_window(root, profile, on_closing)
     root.mainloop()
 
 if __name__ == "__main__":
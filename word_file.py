@@ -0,0 +1,176 @@
+"""Flashing straight from a word file on disk, without importing it"""
+from array import array
+from collections.abc import Sequence
+import hashlib
+import mmap
+import os
+import re
+import struct
+import tempfile
+
+from word_library import WordFileImport, IMPORT_CHUNK_SIZE
+
+INDEX_SUFFIX = ".lineidx"
+INDEX_MAGIC = b"SLWIDX1\n"
+# Magic, size and modification time of the indexed file, number of lines.
+# Native byte order: the index is a cache for this machine, not a format
+INDEX_HEADER = struct.Struct("=8sQqQ")
+
+# Start of a line holding something other than whitespace
+WORD_LINE = re.compile(rb"^[^\S\n]*\S", re.MULTILINE)
+
+
+def line_index_path(path):
+    """Where the line index of a word file lives
+
+    Next to the file when its folder is writable, otherwise in the temp
+    directory under a name derived from the file's path.
+    """
+    path = os.path.abspath(path)
+    if os.access(os.path.dirname(path), os.W_OK):
+        return path + INDEX_SUFFIX
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(tempfile.gettempdir(), f"{os.path.basename(path)}.{digest}{INDEX_SUFFIX}")
+
+
+def file_signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def index_is_current(path, index_path):
+    """True if index_path is a complete index of the file as it is now"""
+    try:
+        with open(index_path, 'rb') as f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                return False
+            magic, size, mtime, count = INDEX_HEADER.unpack(header)
+            f.seek(0, os.SEEK_END)
+            complete = f.tell() == INDEX_HEADER.size + count * 8
+        return magic == INDEX_MAGIC and complete and (size, mtime) == file_signature(path)
+    except OSError:
+        return False
+
+
+def write_line_index(path, blocks, index_path=None):
+    """Write the start offset of every non-blank line of path to its index
+
+    blocks yields the file as consecutive runs of whole lines (see
+    WordFileImport.blocks). Offsets are written out block by block as
+    8-byte integers, so memory use does not depend on the file size. The
+    index is written to a temporary file and renamed into place. Returns
+    the number of lines indexed.
+    """
+    index_path = index_path or line_index_path(path)
+    signature = file_signature(path)
+    temp_path = index_path + ".tmp"
+    count = 0
+    try:
+        with open(temp_path, 'wb') as out:
+            out.write(INDEX_HEADER.pack(INDEX_MAGIC, *signature, 0))
+            base = 0
+            for block in blocks:
+                offsets = array("Q", (base + match.start() for match in WORD_LINE.finditer(block)))
+                offsets.tofile(out)
+                count += len(offsets)
+                base += len(block)
+            out.seek(0)
+            out.write(INDEX_HEADER.pack(INDEX_MAGIC, *signature, count))
+        os.replace(temp_path, index_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
+
+
+class FileWords(Sequence):
+    """Read-only word sequence backed by a file and its line index
+
+    Both the word file and the index are memory-mapped, so a word is read
+    by position in O(1) and the process only holds the pages the operating
+    system keeps cached, whatever the size of the file. Words are the
+    stripped, non-blank lines, as with a normal import. Pickling reopens
+    the file by path, which lets the process renderer flash from it too.
+    The index must be current (see FileIndexJob); call close() when done.
+    """
+
+    def __init__(self, path, index_path=None):
+        self.path = os.path.abspath(path)
+        self.index_path = index_path or line_index_path(self.path)
+        self.open()
+
+    def open(self):
+        with open(self.index_path, 'rb') as f:
+            self.index_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, size, mtime, count = INDEX_HEADER.unpack_from(self.index_map)
+        if magic != INDEX_MAGIC:
+            self.index_map.close()
+            raise ValueError(f"{self.index_path} is not a line index")
+        self.offsets = memoryview(self.index_map)[INDEX_HEADER.size:INDEX_HEADER.size + count * 8].cast("Q")
+        self.length = count
+
+        if size:
+            with open(self.path, 'rb') as f:
+                self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self.data = b""  # Empty files cannot be mapped
+
+    def close(self):
+        self.offsets.release()
+        self.index_map.close()
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+
+    def __getstate__(self):
+        return {"path": self.path, "index_path": self.index_path}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.open()
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.word_at(i) for i in range(*index.indices(self.length))]
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("word index out of range")
+        return self.word_at(index)
+
+    def word_at(self, index):
+        start = self.offsets[index]
+        end = self.data.find(b"\n", start)
+        if end < 0:
+            end = len(self.data)
+        return self.data[start:end].decode("utf-8", errors="replace").strip()
+
+    def __repr__(self):
+        return f"FileWords({self.path!r}, {self.length} words)"
+
+
+class FileIndexJob(WordFileImport):
+    """Builds (or reuses) a file's line index on a worker thread
+
+    Runs like any WordFileImport: the Tk thread polls progress() and done,
+    and consume(FileWords) runs on the worker once the index is ready. An
+    index whose header matches the file's size and modification time is
+    reused as is.
+    """
+
+    def __init__(self, path, consume, chunk_size=IMPORT_CHUNK_SIZE):
+        super().__init__(path, consume, chunk_size)
+        self.index_path = line_index_path(path)
+
+    def words(self):
+        if index_is_current(self.path, self.index_path):
+            self.bytes_read = self.total_bytes
+        else:
+            write_line_index(self.path, self.blocks(), self.index_path)
+        words = FileWords(self.path, self.index_path)
+        self.words_read = len(words)
+        return words
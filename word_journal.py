@@ -0,0 +1,302 @@
+"""Write-ahead journal that keeps library and settings saves off the Tk thread"""
+from collections import deque
+import json
+import os
+import threading
+import time
+
+from word_library import SETTINGS_FILE, write_json_atomic
+
+JOURNAL_FILE = "subliminal_journal.jsonl"
+JOURNAL_SEQ_KEY = "journal_seq"  # Meta key: last journal entry applied to the library
+
+
+def latest_settings(entries):
+    """Drop the settings snapshots a later one in entries replaces"""
+    entries = list(entries)
+    last = max((i for i, entry in enumerate(entries) if entry["op"] == "settings"), default=None)
+    return [entry for i, entry in enumerate(entries) if entry["op"] != "settings" or i == last]
+
+
+class JournaledStore:
+    """CategoryStore front end that saves in the background
+
+    Category changes made on the Tk thread (set, delete, splice),
+    spaced-repetition exposure and settings saves are queued and return at
+    once. A writer thread waits until changes stop arriving for delay
+    seconds (at most max_delay after the first), appends the batch to an
+    append-only JSON-lines journal with a single fsync, and then applies
+    it: category and exposure changes go to the library, each in a
+    transaction that also records the entry's sequence number; of the
+    settings snapshots in a batch only the last is kept and written with
+    write_json_atomic. Once everything queued is applied the journal is
+    truncated, the library and settings file being the compacted snapshot.
+
+    A crash leaves at most the unsynced batch unsaved. On the next start
+    replay() applies journal entries newer than the recorded sequence
+    number, so nothing is applied twice; a torn last line is ignored.
+
+    Until the writer has applied them, changes are kept in an overlay, so
+    reads through this object always see them. Bulk writes (update_many,
+    used by the import jobs on worker threads) wait for the queue to drain
+    and then go straight to the store. Everything else is passed through
+    to the store.
+    """
+
+    def __init__(self, store, path=JOURNAL_FILE, settings_file=SETTINGS_FILE, delay=0.5, max_delay=2.0):
+        self.store = store
+        self.path = path
+        self.settings_file = settings_file
+        self.delay = delay
+        self.max_delay = max_delay
+
+        self.lock = threading.Condition()
+        self.queue = deque()   # Entries not yet written to the journal
+        self.overlay = {}      # {name: (seq, words or None if deleted)} not yet applied
+        self.exposure = {}     # {word: (seq, (times shown, next due))} not yet applied
+        self.first_queued = None
+        self.last_queued = None
+        self.flushing = 0      # flush() calls waiting for the queue to drain
+        self.busy = False      # The writer holds a batch
+        self.closing = False
+        self.error = None      # Last error applying an entry
+
+        self.seq = self.replay()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    # Reads see queued changes
+
+    def __getitem__(self, name):
+        with self.lock:
+            entry = self.overlay.get(name)
+        if entry is None:
+            return self.store[name]
+        if entry[1] is None:
+            raise KeyError(name)
+        return entry[1]
+
+    def __contains__(self, name):
+        with self.lock:
+            entry = self.overlay.get(name)
+        return name in self.store if entry is None else entry[1] is not None
+
+    def names(self):
+        with self.lock:
+            overlay = dict(self.overlay)
+        names = set(self.store.names())
+        for name, (seq, words) in overlay.items():
+            if words is None:
+                names.discard(name)
+            else:
+                names.add(name)
+        return sorted(names)
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self.names())
+
+    def count(self, name):
+        with self.lock:
+            entry = self.overlay.get(name)
+        if entry is None:
+            return self.store.count(name)
+        if entry[1] is None:
+            raise KeyError(name)
+        return len(entry[1])
+
+    def counts(self):
+        return {name: self.count(name) for name in self.names()}
+
+    def load_exposure(self):
+        exposure = self.store.load_exposure()
+        with self.lock:
+            exposure.update((word, value) for word, (seq, value) in self.exposure.items())
+        return exposure
+
+    def __getattr__(self, name):
+        # search, categories_of, migrate_json, path, ...
+        return getattr(self.store, name)
+
+    # Writes are queued
+
+    def __setitem__(self, name, words):
+        words = list(words)
+        self.submit({"op": "set", "name": name, "words": words}, name, words)
+
+    def __delitem__(self, name):
+        if name not in self:
+            raise KeyError(name)
+        self.submit({"op": "delete", "name": name}, name, None)
+
+    def splice(self, name, edits, words=None):
+        """Queue line edits; words is the resulting list, shown until they are applied"""
+        edits = [[start, stop, list(new_words)] for start, stop, new_words in edits]
+        if words is None:
+            words = list(self[name])
+            for start, stop, new_words in edits:
+                words[start:stop] = new_words
+        elif name not in self:
+            raise KeyError(name)
+        self.submit({"op": "splice", "name": name, "edits": edits}, name, words)
+
+    def save_settings(self, data):
+        """Queue a settings snapshot to be written atomically"""
+        self.submit({"op": "settings", "data": data})
+
+    def save_exposure(self, changes):
+        """Queue spaced-repetition {word: (times shown, next due)} changes"""
+        if not changes:
+            return
+        changes = {word: list(value) for word, value in changes.items()}
+        with self.lock:
+            seq = self.submit({"op": "exposure", "changes": changes})
+            for word, value in changes.items():
+                self.exposure[word] = (seq, tuple(value))
+
+    def submit(self, entry, name=None, words=None):
+        with self.lock:
+            self.seq += 1
+            entry["seq"] = self.seq
+            self.queue.append(entry)
+            if name is not None:
+                self.overlay[name] = (self.seq, words)
+            now = time.monotonic()
+            if self.first_queued is None:
+                self.first_queued = now
+            self.last_queued = now
+            self.lock.notify_all()
+            return self.seq
+
+    def update_many(self, categories):
+        """Bulk write straight to the store, after everything queued before it"""
+        self.flush()
+        return self.store.update_many(categories)
+
+    def flush(self, timeout=None):
+        """Write and apply everything queued so far, waiting for the writer"""
+        with self.lock:
+            self.flushing += 1
+            self.lock.notify_all()
+            try:
+                return self.lock.wait_for(lambda: not self.queue and not self.busy, timeout)
+            finally:
+                self.flushing -= 1
+
+    def close(self):
+        """Flush, stop the writer and close the store"""
+        with self.lock:
+            self.closing = True
+            self.lock.notify_all()
+        self.thread.join()
+        self.store.close()
+
+    # Writer thread
+
+    def run(self):
+        while True:
+            with self.lock:
+                self.lock.wait_for(lambda: self.queue or self.closing)
+                if not self.queue:
+                    return  # Closing with nothing left to write
+                # Debounce: wait for a pause, but not forever
+                while not (self.flushing or self.closing):
+                    due = min(self.last_queued + self.delay, self.first_queued + self.max_delay)
+                    remaining = due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.lock.wait(remaining)
+                batch = latest_settings(self.queue)
+                self.queue.clear()
+                self.first_queued = None
+                self.busy = True
+
+            try:
+                self.append(batch)
+                for entry in batch:
+                    self.apply(entry)
+            except Exception as e:
+                self.error = e
+                print(f"Error saving changes: {e}")
+
+            with self.lock:
+                self.busy = False
+                for entry in batch:
+                    name = entry.get("name")
+                    if name is not None and self.overlay.get(name, (None,))[0] == entry["seq"]:
+                        del self.overlay[name]
+                    for word in entry.get("changes", ()):
+                        if self.exposure.get(word, (None,))[0] == entry["seq"]:
+                            del self.exposure[word]
+                if not self.queue and self.error is None:
+                    self.compact()
+                self.lock.notify_all()
+
+    def append(self, batch):
+        """Add entries to the journal with one fsync"""
+        with open(self.path, 'a', encoding="utf-8") as f:
+            for entry in batch:
+                f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def apply(self, entry):
+        op = entry["op"]
+        if op == "settings":
+            write_json_atomic(self.settings_file, entry["data"])
+            return
+
+        meta = {JOURNAL_SEQ_KEY: entry["seq"]}
+        if op == "exposure":
+            self.store.save_exposure(entry["changes"], meta=meta)
+            return
+
+        name = entry["name"]
+        try:
+            if op == "set":
+                self.store.update_many({name: entry["words"]}, meta=meta)
+            elif op == "delete":
+                self.store.delete(name, meta=meta)
+            elif op == "splice":
+                with self.lock:
+                    overlay = self.overlay.get(name)
+                words = overlay[1] if overlay and overlay[0] == entry["seq"] else None
+                self.store.splice(name, entry["edits"], words, meta=meta)
+        except KeyError:
+            # Deleted by an earlier entry; just record the progress
+            self.store.set_meta(JOURNAL_SEQ_KEY, entry["seq"])
+
+    def compact(self):
+        """Everything is in the library and settings file, start an empty journal"""
+        if os.path.exists(self.path) and os.path.getsize(self.path):
+            with open(self.path, 'w'):
+                pass
+
+    def replay(self):
+        """Apply journal entries left over from a crash, returns the last sequence number"""
+        applied = int(self.store.get_meta(JOURNAL_SEQ_KEY, 0))
+        if not os.path.exists(self.path):
+            return applied
+
+        seq = applied
+        entries = []
+        with open(self.path, 'r', encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break  # Torn write at the end of the journal
+                seq = max(seq, entry["seq"])
+                # Settings carry no sequence number in the library, rewriting them is harmless
+                if entry["seq"] > applied or entry["op"] == "settings":
+                    entries.append(entry)
+        entries = latest_settings(entries)
+        for entry in entries:
+            self.apply(entry)
+        replayed = len(entries)
+        if replayed:
+            print(f"Recovered {replayed} unsaved changes from {self.path}")
+        self.compact()
+        return seq
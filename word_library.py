@@ -0,0 +1,859 @@
+"""Persistent storage for categories and their word lists"""
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+import concurrent.futures
+import glob
+import itertools
+import json
+import math
+import os
+import shutil
+import sqlite3
+import threading
+from pathlib import Path
+
+from word_pool import WordPool, PooledWords
+
+LIBRARY_FILE = "subliminal_library.db"
+MAX_POSITION = 2 ** 63 - 1  # Upper bound for "to the end of the category"
+POOL_MIN_COMPACT = 100000  # Distinct words a WordPool may hold before it is compacted
+SETTINGS_FILE = "subliminal_settings.json"
+IMPORT_CHUNK_SIZE = 1024 * 1024
+WORD_FILE_PATTERNS = ("*.txt", "*.csv")
+
+
+def word_lines(data):
+    """Stripped, non-empty lines of a block of whole UTF-8 lines"""
+    # A newline byte never occurs inside a multi-byte UTF-8 sequence, so a
+    # run of whole lines decodes on its own
+    return [line for line in (line.strip() for line in data.decode("utf-8").split("\n")) if line]
+
+
+def write_json_atomic(path, data):
+    """Write data as JSON so that path holds either the old or the new file
+
+    The JSON goes to a temporary file next to path, is fsynced and then
+    renamed over path, so a crash or power loss mid-write cannot leave a
+    truncated file behind.
+    """
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+def category_name_for(path):
+    """Default category name for a word file: its name without extension"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def find_word_files(pattern):
+    """Word files in a directory, or the files matching a glob pattern"""
+    if os.path.isdir(pattern):
+        paths = [path for ext in WORD_FILE_PATTERNS for path in glob.glob(os.path.join(pattern, ext))]
+    else:
+        paths = glob.glob(pattern, recursive=True)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def gap_positions(before, after, count):
+    """count increasing positions strictly between before and after
+
+    None for before or after means no bound on that side. Whole numbers
+    are used where they fit, evenly spaced fractions otherwise. Returns
+    None if the gap is too narrow for the float resolution.
+    """
+    if before is None:
+        before = math.ceil(after) - count - 1 if after is not None else -1
+    if after is None or math.floor(before) + count < after:
+        return [math.floor(before) + 1 + i for i in range(count)]
+    step = (after - before) / (count + 1)
+    positions = [before + step * (i + 1) for i in range(count)]
+    if all(low < high for low, high in zip([before] + positions, positions + [after])):
+        return positions
+    return None
+
+
+def read_word_file(path):
+    """Return (category name, words) for one file, run in the import pool"""
+    with open(path, 'rb') as f:
+        return category_name_for(path), word_lines(f.read())
+
+
+class CategoryStore(MutableMapping):
+    """Categories and words kept in a SQLite file
+
+    Behaves like the {category_name: [words]} dict the app used to hold in
+    memory, but every assignment or deletion is its own committed
+    transaction, so a crash loses at most the edit in flight.
+
+    Opening the store reads only an index of category names and word counts,
+    so startup cost and memory depend on the number of categories, not on
+    the number of words. A category's words are read the first time it is
+    accessed and kept in a small LRU of recently used categories, plus any
+    categories pinned with pin().
+
+        store["Focus"] = ["calm", "clear"]   # replace one category
+        del store["Focus"]                   # delete it with its words
+        store.counts()                       # {name: word count} without loading words
+
+    Word lists handed out or stored are shared with the LRU, so treat them
+    as read-only and assign a new list to change a category. With a
+    WordPool, loaded categories are kept as PooledWords: each distinct word
+    is stored once as UTF-8 however many categories contain it. A category
+    is handed out as a plain list when it is read and interned afterwards
+    on a background thread, so reads never wait for the pool.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE,
+            word_count INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE TABLE IF NOT EXISTS words (
+            category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            word TEXT NOT NULL,
+            PRIMARY KEY (category_id, position)
+        ) WITHOUT ROWID;
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS exposure (
+            word TEXT PRIMARY KEY,
+            shown INTEGER NOT NULL,
+            due REAL NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    # Every distinct word with the number of rows holding it, so searches
+    # never scan the words table. Kept up to date a batch of rows at a time
+    # by add_vocabulary/remove_vocabulary, which is several times cheaper
+    # for imports than per-row triggers. folded is the casefolded word, so
+    # prefix searches ignore case like the trigram index does
+    VOCABULARY_SCHEMA = """
+        CREATE INDEX IF NOT EXISTS words_by_word ON words (word);
+        CREATE TABLE IF NOT EXISTS vocabulary (
+            id INTEGER PRIMARY KEY,
+            word TEXT NOT NULL UNIQUE,
+            uses INTEGER NOT NULL,
+            folded TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS vocabulary_by_folded ON vocabulary (folded);
+    """
+
+    # Trigram full-text index over the vocabulary for substring search,
+    # where the SQLite build has FTS5 with the trigram tokenizer (3.34+)
+    SEARCH_SCHEMA = """
+        CREATE VIRTUAL TABLE word_search USING fts5 (
+            word, content = 'vocabulary', content_rowid = 'id', tokenize = 'trigram'
+        );
+        CREATE TRIGGER vocabulary_search_add AFTER INSERT ON vocabulary BEGIN
+            INSERT INTO word_search (rowid, word) VALUES (new.id, new.word);
+        END;
+        CREATE TRIGGER vocabulary_search_remove AFTER DELETE ON vocabulary BEGIN
+            INSERT INTO word_search (word_search, rowid, word) VALUES ('delete', old.id, old.word);
+        END;
+    """
+
+    def __init__(self, path=LIBRARY_FILE, max_loaded=8, pool=None):
+        self.path = Path(path)
+        self.max_loaded = max_loaded
+        self.loaded = OrderedDict()  # {name: [words]}, most recently used last
+        self.pool = pool
+        self.pinned = frozenset()    # Names the LRU never drops, see pin()
+        self.intern_queue = deque()  # (name, words) loaded lists waiting to be pooled
+        self.interner = None         # Thread running intern_loaded while the queue has work
+
+        # Writes (possibly from an import thread) go through conn one
+        # transaction at a time; word reads use their own connection so WAL
+        # lets them see the last commit instead of waiting for a long write
+        self.write_lock = threading.Lock()
+        self.read_lock = threading.Lock()  # also guards the LRU
+        self.conn = self.connect()
+        self.conn.executescript(self.SCHEMA)
+        self.upgrade_schema()
+        self.reader = self.connect()
+
+        # {name: (category_id, word_count)}, replaced as a whole after each commit
+        self.index = {}
+        self.reload_index()
+
+    def connect(self):
+        conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON")
+        # WAL keeps commits cheap; NORMAL sync is still safe against app crashes
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        # Imports insert into the word index in random order, which is far
+        # cheaper when its pages stay cached (64 MB instead of the default 2)
+        conn.execute("PRAGMA cache_size = -65536")
+        # Python's casefold, for the vocabulary's folded column
+        conn.create_function("casefold", 1, str.casefold, deterministic=True)
+        return conn
+
+    def upgrade_schema(self):
+        """Add the word_count column and the search index to older libraries"""
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(categories)")]
+        if "word_count" not in columns:
+            with self.conn:
+                self.conn.execute("ALTER TABLE categories ADD COLUMN word_count INTEGER NOT NULL DEFAULT 0")
+                self.conn.execute("UPDATE categories SET word_count = "
+                                  "(SELECT COUNT(*) FROM words WHERE category_id = categories.id)")
+
+        if not self.has_table("vocabulary"):
+            with self.conn:
+                self.conn.executescript("BEGIN;" + self.VOCABULARY_SCHEMA)
+                self.conn.execute("INSERT INTO vocabulary (word, uses, folded) "
+                                  "SELECT word, COUNT(*), casefold(word) FROM words GROUP BY word")
+        elif "folded" not in [row[1] for row in self.conn.execute("PRAGMA table_info(vocabulary)")]:
+            with self.conn:
+                self.conn.execute("ALTER TABLE vocabulary ADD COLUMN folded TEXT NOT NULL DEFAULT ''")
+                self.conn.execute("UPDATE vocabulary SET folded = casefold(word)")
+                self.conn.execute("CREATE INDEX vocabulary_by_folded ON vocabulary (folded)")
+        if not self.has_table("word_search"):
+            try:
+                with self.conn:
+                    self.conn.executescript("BEGIN;" + self.SEARCH_SCHEMA)
+                    self.conn.execute("INSERT INTO word_search (word_search) VALUES ('rebuild')")
+            except sqlite3.OperationalError:
+                pass  # No FTS5 trigram tokenizer, search() falls back to LIKE
+        self.full_text = self.has_table("word_search")
+
+    def has_table(self, name):
+        return self.conn.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+    def close(self):
+        with self.write_lock, self.read_lock:
+            self.reader.close()
+            self.conn.close()
+
+    def category_id(self, name):
+        entry = self.index.get(name)
+        return entry[0] if entry else None
+
+    def __getitem__(self, name):
+        with self.read_lock:
+            words = self.loaded.get(name)
+            if words is not None:
+                self.loaded.move_to_end(name)
+                return words
+
+            category_id = self.category_id(name)
+            if category_id is None:
+                raise KeyError(name)
+            rows = self.reader.execute(
+                "SELECT word FROM words WHERE category_id = ? ORDER BY position", (category_id,))
+            return self.remember(name, [row[0] for row in rows])
+
+    def remember(self, name, words):
+        """Put a category's words in the LRU, dropping the least recently used
+
+        Called with read_lock held. With a pool, plain lists are queued for
+        intern_loaded rather than interned here.
+        """
+        self.loaded[name] = words
+        self.loaded.move_to_end(name)
+        self.trim()
+        if self.pool is not None and not isinstance(words, PooledWords):
+            self.intern_queue.append((name, words))
+            if self.interner is None:
+                self.interner = threading.Thread(target=self.intern_loaded, daemon=True)
+                self.interner.start()
+        return words
+
+    def trim(self):
+        """Drop least recently used categories beyond max_loaded, never pinned ones"""
+        excess = len(self.loaded) - self.max_loaded
+        if excess > 0:
+            for name in [name for name in self.loaded if name not in self.pinned][:excess]:
+                del self.loaded[name]
+
+    def pin(self, names):
+        """Keep these categories loaded once read, however many there are
+
+        The app pins the current selection, so a selection larger than
+        max_loaded is not read from disk again on every change.
+        """
+        with self.read_lock:
+            self.pinned = frozenset(names)
+            self.trim()
+
+    def intern_loaded(self):
+        """Interner thread: replace queued lists in the LRU with PooledWords
+
+        The only place the pool is written to, so interning needs no lock
+        of its own; read_lock is only taken to look at and update the LRU.
+        Lists evicted or replaced in the meantime are skipped.
+        """
+        while True:
+            with self.read_lock:
+                if not self.intern_queue:
+                    self.interner = None
+                    return
+                name, words = self.intern_queue.popleft()
+                if self.loaded.get(name) is not words:
+                    continue
+                pool = self.pool
+            pooled = PooledWords(pool, pool.intern_many(words))
+            with self.read_lock:
+                if self.loaded.get(name) is words:
+                    self.loaded[name] = pooled
+            self.compact_pool()
+
+    def compact_pool(self):
+        """Start a new pool when most words in the current one are no longer loaded
+
+        Runs on the interner thread. Lists already handed out keep the old
+        pool alive until they are dropped; the LRU is re-interned into the
+        new one.
+        """
+        with self.read_lock:
+            live = sum(len(words) for words in self.loaded.values())
+            if len(self.pool) <= max(POOL_MIN_COMPACT, 2 * live):
+                return
+            loaded = list(self.loaded.items())
+        pool = WordPool()
+        pooled = {name: PooledWords(pool, pool.intern_many(words)) for name, words in loaded}
+        with self.read_lock:
+            for name, words in loaded:
+                if self.loaded.get(name) is words:
+                    self.loaded[name] = pooled[name]
+            self.pool = pool
+
+    def __setitem__(self, name, words):
+        """Create or replace a category in a single transaction"""
+        self.update_many({name: words})
+
+    def __delitem__(self, name):
+        self.delete(name)
+
+    def delete(self, name, meta=None):
+        """Delete a category with its words; meta as for update_many"""
+        with self.write_lock:
+            if name not in self.index:
+                raise KeyError(name)
+            with self.conn:
+                self.remove_vocabulary(self.index[name][0])
+                self.conn.execute("DELETE FROM categories WHERE name = ?", (name,))
+                self.write_meta(meta)
+            index = dict(self.index)
+            del index[name]
+            self.index = index
+        with self.read_lock:
+            self.loaded.pop(name, None)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __iter__(self):
+        return iter(self.names())
+
+    def __len__(self):
+        return len(self.index)
+
+    def count(self, name):
+        """Number of words in a category without loading them"""
+        return self.index[name][1]
+
+    def names(self):
+        """Category names in sorted order"""
+        return sorted(self.index)
+
+    def counts(self):
+        """Return {name: word count} without reading any words"""
+        return {name: count for name, (category_id, count) in self.index.items()}
+
+    def update_many(self, categories, meta=None):
+        """Create or replace several categories in one transaction
+
+        Word lists may be any iterable; generators are streamed into the
+        database without being held in memory. If one raises (for example
+        ImportCancelled), the whole transaction is rolled back. meta, a
+        {key: value} dict, is written to the meta table in the same
+        transaction (the write journal records its progress this way).
+        """
+        with self.write_lock:
+            # Readers keep using the old index until the commit succeeded
+            index = dict(self.index)
+            with self.conn:
+                for name, words in categories.items():
+                    index[name] = self.write_category(index.get(name), name, words)
+                self.write_meta(meta)
+            self.index = index
+        with self.read_lock:
+            # Bulk writes would mostly push each other out of the LRU again,
+            # so written categories are read back when they are next used
+            for name in categories:
+                self.loaded.pop(name, None)
+
+    def splice(self, name, edits, words=None, meta=None):
+        """Apply line edits to a category in one transaction
+
+        edits is a list of (start, stop, new_words), each replacing
+        positions start:stop of the list as left by the edits before it.
+        Only the edited rows are written, the rows after an edit keep their
+        positions (see splice_rows). words, if given, is the
+        resulting full list and goes into the LRU. meta as for update_many.
+        """
+        with self.write_lock:
+            if name not in self.index:
+                raise KeyError(name)
+            category_id, count = self.index[name]
+            with self.conn:
+                for start, stop, new_words in edits:
+                    count = self.splice_rows(category_id, count, start, stop, new_words)
+                self.conn.execute("UPDATE categories SET word_count = ? WHERE id = ?", (count, category_id))
+                self.write_meta(meta)
+            index = dict(self.index)
+            index[name] = (category_id, count)
+            self.index = index
+        with self.read_lock:
+            if words is not None:
+                self.remember(name, words)
+            else:
+                self.loaded.pop(name, None)
+
+    def splice_rows(self, category_id, count, start, stop, words):
+        """Replace rows start:stop of a category with words, returns the new word count
+
+        start and stop are list indices, clamped to the category. Positions
+        only order the rows and need not be contiguous: deleting leaves a
+        gap, and new rows get positions spread between their neighbours,
+        as fractions if need be, so no other row is touched. Only when the
+        neighbours are too close for that is the category renumbered.
+        """
+        start = max(0, min(start, count))
+        stop = max(start, min(stop, count))
+        before = self.row_position(category_id, start - 1)
+        after = self.row_position(category_id, stop)
+        if stop > start:
+            first = self.row_position(category_id, start)
+            end = MAX_POSITION if after is None else after
+            self.remove_vocabulary(category_id, first, end)
+            self.conn.execute("DELETE FROM words WHERE category_id = ? AND position >= ? AND position < ?",
+                              (category_id, first, end))
+        if words:
+            positions = gap_positions(before, after, len(words))
+            if positions is None:
+                self.renumber(category_id)
+                before = start - 1 if start else None
+                after = start if stop < count else None
+                positions = gap_positions(before, after, len(words))
+            self.conn.executemany(
+                "INSERT INTO words (category_id, position, word) VALUES (?, ?, ?)",
+                ((category_id, position, word) for position, word in zip(positions, words)))
+            self.add_vocabulary(category_id, positions[0], MAX_POSITION if after is None else after)
+        return count + len(words) - (stop - start)
+
+    def row_position(self, category_id, index):
+        """Position of a category's index-th row, None outside the category"""
+        if index < 0:
+            return None
+        row = self.conn.execute("SELECT position FROM words WHERE category_id = ? ORDER BY position "
+                                "LIMIT 1 OFFSET ?", (category_id, index)).fetchone()
+        return row[0] if row else None
+
+    def renumber(self, category_id):
+        """Give a category's rows the positions 0, 1, 2, ... again, in order"""
+        # Through positions above every current one, so that no row collides
+        # with another one's primary key on the way
+        shift = math.ceil(self.conn.execute("SELECT MAX(position) FROM words WHERE category_id = ?",
+                                            (category_id,)).fetchone()[0] or 0) + 1
+        self.conn.execute(
+            "UPDATE words SET position = ? + ranked.n FROM "
+            "(SELECT position AS old, ROW_NUMBER() OVER (ORDER BY position) AS n FROM words "
+            "WHERE category_id = ?) AS ranked WHERE words.category_id = ? AND words.position = ranked.old",
+            (shift, category_id, category_id))
+        self.conn.execute("UPDATE words SET position = position - ? - 1 WHERE category_id = ?",
+                          (shift, category_id))
+
+    def reload_index(self):
+        """Re-read the name/count index from disk and forget loaded words"""
+        with self.write_lock:
+            self.index = {name: (category_id, count) for category_id, name, count in
+                          self.conn.execute("SELECT id, name, word_count FROM categories")}
+        with self.read_lock:
+            self.loaded.clear()
+
+    def write_category(self, entry, name, words):
+        """Replace a category's words, the caller owns the transaction
+
+        entry is the category's current (category_id, word_count) or None,
+        returns the new one.
+        """
+        if entry is None:
+            category_id = self.conn.execute("INSERT INTO categories (name) VALUES (?)", (name,)).lastrowid
+        else:
+            category_id = entry[0]
+            self.remove_vocabulary(category_id)
+            self.conn.execute("DELETE FROM words WHERE category_id = ?", (category_id,))
+        # executemany consumes any iterable, so count rows as they are inserted
+        positions = itertools.count()
+        self.conn.executemany(
+            "INSERT INTO words (category_id, position, word) VALUES (?, ?, ?)",
+            ((category_id, next(positions), word) for word in words))
+        count = next(positions)
+        self.add_vocabulary(category_id)
+        self.conn.execute("UPDATE categories SET word_count = ? WHERE id = ?", (count, category_id))
+        return category_id, count
+
+    def add_vocabulary(self, category_id, start=-MAX_POSITION, stop=None):
+        """Count the words at positions start:stop of a category into the vocabulary"""
+        self.conn.execute(
+            "INSERT INTO vocabulary (word, uses, folded) SELECT word, COUNT(*), casefold(word) FROM words "
+            "WHERE category_id = ? AND position >= ? AND position < ? GROUP BY word "
+            "ON CONFLICT (word) DO UPDATE SET uses = uses + excluded.uses",
+            (category_id, start, MAX_POSITION if stop is None else stop))
+
+    def remove_vocabulary(self, category_id, start=-MAX_POSITION, stop=None):
+        """Uncount the words at positions start:stop, before their rows are deleted"""
+        args = (category_id, start, MAX_POSITION if stop is None else stop)
+        self.conn.execute(
+            "UPDATE vocabulary SET uses = uses - gone.count FROM "
+            "(SELECT word, COUNT(*) AS count FROM words WHERE category_id = ? AND position >= ? AND position < ? "
+            "GROUP BY word) AS gone WHERE vocabulary.word = gone.word", args)
+        self.conn.execute(
+            "DELETE FROM vocabulary WHERE uses <= 0 AND word IN "
+            "(SELECT word FROM words WHERE category_id = ? AND position >= ? AND position < ?)", args)
+
+    def categories_of(self, word):
+        """Sorted names of the categories containing word exactly"""
+        with self.read_lock:
+            rows = self.reader.execute(
+                "SELECT DISTINCT categories.name FROM words JOIN categories ON categories.id = words.category_id "
+                "WHERE words.word = ?", (word,)).fetchall()
+        return sorted(row[0] for row in rows)
+
+    def search(self, text, limit=100, prefix=False):
+        """Return [(word, uses)] of distinct words containing text, ignoring case
+
+        Substring matches go through the trigram index. With prefix=True,
+        and for queries shorter than three characters (too short for a
+        trigram), only words starting with text are found, with a range
+        scan of the casefolded vocabulary index. Without the trigram
+        tokenizer substring matches fall back to scanning the vocabulary.
+        uses is the number of rows, across all categories, holding the
+        word.
+        """
+        if not text:
+            return []
+        folded = text.casefold()
+        if prefix or len(text) < 3:
+            # Every string starting with folded sorts between folded and folded + U+10FFFF
+            sql = "SELECT word, uses FROM vocabulary WHERE folded >= ? AND folded < ? ORDER BY folded LIMIT ?"
+            args = (folded, folded + "\U0010ffff", limit)
+        elif self.full_text:
+            sql = ("SELECT vocabulary.word, vocabulary.uses FROM word_search "
+                   "JOIN vocabulary ON vocabulary.id = word_search.rowid "
+                   "WHERE word_search MATCH ? LIMIT ?")
+            args = ('"' + text.replace('"', '""') + '"', limit)
+        else:
+            pattern = "%" + folded.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            sql = "SELECT word, uses FROM vocabulary WHERE folded LIKE ? ESCAPE '\\' LIMIT ?"
+            args = (pattern, limit)
+        with self.read_lock:
+            return self.reader.execute(sql, args).fetchall()
+
+    def get_meta(self, key, default=None):
+        with self.read_lock:
+            row = self.reader.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key, value):
+        with self.write_lock, self.conn:
+            self.write_meta({key: value})
+
+    def write_meta(self, meta):
+        """Store {key: value} pairs, the caller owns the transaction"""
+        if meta:
+            self.conn.executemany("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", meta.items())
+
+    def load_exposure(self):
+        """Return {word: (times shown, next due)} for spaced repetition"""
+        with self.read_lock:
+            rows = self.reader.execute("SELECT word, shown, due FROM exposure").fetchall()
+        return {word: (shown, due) for word, shown, due in rows}
+
+    def save_exposure(self, changes, meta=None):
+        """Store {word: (times shown, next due)} entries, replacing older ones"""
+        if not changes and not meta:
+            return
+        with self.write_lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO exposure (word, shown, due) VALUES (?, ?, ?)",
+                ((word, shown, due) for word, (shown, due) in changes.items()))
+            self.write_meta(meta)
+
+    def migrate_json(self, settings_file=SETTINGS_FILE):
+        """Import categories from a pre-SQLite settings file, once
+
+        The original file is copied to <name>.bak before anything is
+        imported; the app drops the categories from the JSON on its next
+        save. Returns the number of categories imported.
+        """
+        settings_file = Path(settings_file)
+        if self.get_meta("migrated_json") or not settings_file.exists():
+            return 0
+
+        with open(settings_file, 'r') as f:
+            categories = json.load(f).get("categories") or {}
+
+        if categories:
+            shutil.copyfile(settings_file, settings_file.with_name(settings_file.name + ".bak"))
+        self.update_many(categories)
+        # Re-running an interrupted import just replaces the same categories again
+        self.set_meta("migrated_json", str(settings_file))
+        return len(categories)
+
+
+class ImportCancelled(Exception):
+    """Raised inside an import's word stream once it has been cancelled"""
+
+
+class WordFileImport:
+    """Streams a UTF-8, newline-delimited word file on a worker thread
+
+    consume(words) runs on the worker with a generator of stripped,
+    non-empty lines and its return value becomes result. The file is read
+    in fixed-size chunks, so apart from whatever consume keeps, memory use
+    does not grow with the file. Cancelling makes the generator raise
+    ImportCancelled at the next chunk, which also rolls back a
+    CategoryStore write that was consuming it.
+
+    The Tk thread polls done, progress() and words_read (e.g. with
+    root.after) and looks at result, error and cancelled once done is set.
+    """
+
+    def __init__(self, path, consume, chunk_size=IMPORT_CHUNK_SIZE, total_bytes=None):
+        self.path = path
+        self.consume = consume
+        self.chunk_size = chunk_size
+        # What progress() counts against; subclasses may count something other than bytes
+        self.total_bytes = os.path.getsize(path) if total_bytes is None else total_bytes
+        self.bytes_read = 0
+        self.words_read = 0
+
+        self.cancel_event = threading.Event()
+        self.done = threading.Event()
+        self.thread = None
+        self.result = None
+        self.error = None
+        self.cancelled = False
+        self.skipped = {}  # {path: error} for files that could not be read
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def progress(self):
+        """Fraction of the file read so far"""
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def run(self):
+        """Worker thread"""
+        try:
+            self.result = self.consume(self.words())
+        except ImportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def words(self):
+        """Yield the file's words, one chunk at a time"""
+        for block in self.blocks():
+            yield from self.split(block)
+
+    def blocks(self):
+        """Yield the file as consecutive runs of whole lines, about chunk_size each"""
+        with open(self.path, 'rb') as f:
+            partial = b""  # Incomplete last line of the previous chunk
+            while True:
+                if self.cancel_event.is_set():
+                    raise ImportCancelled(self.path)
+                chunk = f.read(self.chunk_size)
+                if not chunk:
+                    break
+                self.bytes_read += len(chunk)
+
+                chunk = partial + chunk
+                end = chunk.rfind(b"\n") + 1
+                partial = chunk[end:]
+                yield chunk[:end]
+            yield partial
+
+    def split(self, data):
+        words = word_lines(data)
+        self.words_read += len(words)
+        return words
+
+
+class BulkImport(WordFileImport):
+    """Parses many word files in a process pool, one category per file
+
+    Files are read and normalized by worker processes; the worker thread
+    collects the results and calls consume({name: words}) once with all of
+    them, so they can be merged in a single transaction. Progress counts
+    files rather than bytes. Cancelling drops the files that have not been
+    parsed yet and skips consume() entirely.
+    """
+
+    def __init__(self, path, consume, paths=None, max_workers=None):
+        paths = find_word_files(path) if paths is None else paths
+        super().__init__(path, consume, total_bytes=len(paths))  # progress() counts files
+        self.paths = paths
+        self.max_workers = max_workers
+
+    def run(self):
+        """Worker thread"""
+        try:
+            categories = self.parse()
+            self.result = self.consume(categories)
+        except ImportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def parse(self):
+        """Return {category name: words} for all files, in path order"""
+        parsed = {}
+        with concurrent.futures.ProcessPoolExecutor(self.max_workers) as pool:
+            futures = {pool.submit(read_word_file, path): path for path in self.paths}
+            for future in concurrent.futures.as_completed(futures):
+                if self.cancel_event.is_set():
+                    pool.shutdown(cancel_futures=True)
+                    raise ImportCancelled(self.path)
+                path = futures[future]
+                try:
+                    parsed[path] = future.result()
+                    self.words_read += len(parsed[path][1])
+                except (OSError, UnicodeDecodeError) as e:
+                    self.skipped[path] = e
+                self.bytes_read += 1
+
+        # Later files win when two share a name (e.g. focus.txt and focus.csv)
+        return dict(parsed[path] for path in self.paths if path in parsed)
+
+
+STRUCTURED_FORMATS = {".csv": "csv", ".tsv": "tsv", ".tab": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+
+
+def structured_format(path):
+    """'csv', 'tsv' or 'jsonl' for a table file, None for plain word lists"""
+    return STRUCTURED_FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def read_columns(path, fmt=None):
+    """Column names of a CSV/TSV header or the first JSONL record"""
+    fmt = fmt or structured_format(path)
+    if fmt == "jsonl":
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    return [str(key) for key in json.loads(line)]
+        return []
+
+    import pandas as pd
+    return [str(column) for column in
+            pd.read_csv(path, sep="\t" if fmt == "tsv" else ",", nrows=0, encoding="utf-8").columns]
+
+
+class StructuredImport(WordFileImport):
+    """Imports a column of a CSV, TSV or JSONL file with pandas
+
+    The file is parsed in chunks of chunk_rows rows, reading only the word
+    column and, if given, a category column. Each chunk is stripped and
+    length-filtered with vectorized string operations; duplicates are
+    dropped once over everything that was kept. With a category column
+    one pass fans the file out into {category: words}, otherwise all
+    words go to default_category. consume() gets that dict.
+    """
+
+    def __init__(self, path, consume, word_column, category_column=None, default_category=None,
+                 fmt=None, dedupe=True, min_length=1, max_length=None, chunk_rows=100000):
+        super().__init__(path, consume)
+        self.fmt = fmt or structured_format(path) or "csv"
+        self.word_column = word_column
+        self.category_column = category_column
+        self.default_category = default_category or category_name_for(path)
+        self.dedupe = dedupe
+        self.min_length = max(1, min_length)  # Empty words are never kept
+        self.max_length = max_length
+        self.chunk_rows = chunk_rows
+
+    def run(self):
+        """Worker thread"""
+        try:
+            self.result = self.consume(self.parse())
+        except ImportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done.set()
+
+    def read_chunks(self, f):
+        import pandas as pd
+
+        columns = [self.word_column] + ([self.category_column] if self.category_column else [])
+        if self.fmt == "jsonl":
+            for chunk in pd.read_json(f, lines=True, chunksize=self.chunk_rows, dtype=False):
+                # Records may lack a key; those rows come out as NaN and are dropped in filter_chunk
+                yield chunk.reindex(columns=columns)
+        else:
+            # Everything as text, and empty cells stay "" instead of NaN
+            yield from pd.read_csv(f, sep="\t" if self.fmt == "tsv" else ",", usecols=columns,
+                                   dtype=str, keep_default_na=False, chunksize=self.chunk_rows,
+                                   encoding="utf-8")
+
+    def parse(self):
+        """Return {category: words} in file order"""
+        import pandas as pd
+
+        kept = []
+        with open(self.path, 'rb') as f:
+            for chunk in self.read_chunks(f):
+                if self.cancel_event.is_set():
+                    raise ImportCancelled(self.path)
+                kept.append(self.filter_chunk(chunk))
+                self.words_read += len(kept[-1])
+                self.bytes_read = f.tell()  # How far the parser has buffered
+        self.bytes_read = self.total_bytes
+
+        if not kept:
+            return {}
+        table = pd.concat(kept, ignore_index=True)
+        if self.dedupe:
+            table = table.drop_duplicates()
+            self.words_read = len(table)
+        return {category: words.tolist() for category, words in table.groupby("category", sort=False)["word"]}
+
+    def filter_chunk(self, chunk):
+        """Strip and length-filter one chunk into a (category, word) frame"""
+        import pandas as pd
+
+        # Missing or null JSON values would otherwise become "nan"/"None" words
+        chunk = chunk.dropna(subset=[self.word_column] + ([self.category_column] if self.category_column else []))
+        words = chunk[self.word_column].astype(str).str.strip()
+        if self.category_column:
+            categories = chunk[self.category_column].astype(str).str.strip()
+        else:
+            categories = pd.Series(self.default_category, index=chunk.index)
+
+        lengths = words.str.len()
+        mask = (lengths >= self.min_length) & (categories.str.len() > 0)
+        if self.max_length:
+            mask &= lengths <= self.max_length
+        return pd.DataFrame({"category": categories[mask], "word": words[mask]})
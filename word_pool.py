@@ -0,0 +1,155 @@
+"""Compact, interned storage for loaded word lists"""
+from array import array
+from collections.abc import Sequence
+import sys
+
+# Word IDs are 4-byte unsigned ints, plenty for any library
+ID_TYPECODE = "I"
+
+
+class WordPool:
+    """Each distinct word stored once, as UTF-8 in a single blob
+
+    Word i is blob[offsets[i]:offsets[i + 1]]. Interning goes through an
+    open-addressing hash table of word IDs (an array, not a dict of
+    strings), so a word costs its UTF-8 bytes plus about 24 bytes of
+    bookkeeping, against ~50 bytes of str header per copy plus an 8-byte
+    list slot in a list of str.
+
+    The pool only grows; CategoryStore replaces it with a fresh one when
+    most of it is no longer referenced by loaded categories. Interning is
+    not thread-safe (the store only interns on its interner thread),
+    reading words is.
+    """
+
+    def __init__(self):
+        self.blob = bytearray()
+        self.offsets = array("Q", [0])
+        self.slots = array("q", [-1] * 1024)  # Word ID per slot, -1 when empty
+        self.mask = len(self.slots) - 1
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def data(self, word_id):
+        return bytes(self.blob[self.offsets[word_id]:self.offsets[word_id + 1]])
+
+    def word(self, word_id):
+        return self.blob[self.offsets[word_id]:self.offsets[word_id + 1]].decode("utf-8")
+
+    def intern(self, word):
+        """Return the ID of word, adding it if it is new"""
+        data = word.encode("utf-8")
+        if self.slots is None:
+            self.rehash()
+        blob, offsets, slots, mask = self.blob, self.offsets, self.slots, self.mask
+        slot = hash(data) & mask
+        word_id = slots[slot]
+        while word_id >= 0:
+            if blob[offsets[word_id]:offsets[word_id + 1]] == data:
+                return word_id
+            slot = (slot + 1) & mask
+            word_id = slots[slot]
+
+        word_id = len(offsets) - 1
+        blob += data
+        offsets.append(len(blob))
+        slots[slot] = word_id
+        if 2 * len(offsets) > len(slots):
+            self.rehash(2 * len(slots))
+        return word_id
+
+    def intern_many(self, words):
+        """Return the IDs of an iterable of words as a compact array"""
+        return array(ID_TYPECODE, map(self.intern, words))
+
+    def rehash(self, size=None):
+        """Rebuild the hash table, keeping it at most half full"""
+        size = size or max(1024, 1 << (2 * len(self)).bit_length())
+        self.slots = array("q", [-1]) * size
+        self.mask = size - 1
+        for word_id in range(len(self)):
+            slot = hash(self.data(word_id)) & self.mask
+            while self.slots[slot] >= 0:
+                slot = (slot + 1) & self.mask
+            self.slots[slot] = word_id
+
+    def __getstate__(self):
+        # bytes hashes are salted per process, the table is rebuilt on the next intern()
+        return {"blob": self.blob, "offsets": self.offsets, "slots": None, "mask": 0}
+
+    def nbytes(self):
+        """Bytes held by the pool's buffers"""
+        slots = len(self.slots) * self.slots.itemsize if self.slots is not None else 0
+        return len(self.blob) + len(self.offsets) * self.offsets.itemsize + slots
+
+
+class PooledWords(Sequence):
+    """Read-only word list stored as an array of IDs into a WordPool
+
+    Indexing decodes one word from the pool, so a list handed to the
+    renderer only turns into str objects one flash at a time. Slices are
+    returned as plain lists.
+    """
+
+    def __init__(self, pool, ids):
+        self.pool = pool
+        self.ids = ids
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.pool.word(word_id) for word_id in self.ids[index]]
+        return self.pool.word(self.ids[index])
+
+    def __iter__(self):
+        return map(self.pool.word, self.ids)
+
+    def nbytes(self):
+        """Bytes held by the ID array (the pool is shared)"""
+        return len(self.ids) * self.ids.itemsize
+
+    def __repr__(self):
+        return f"PooledWords({len(self.ids)} words)"
+
+
+def list_layout_bytes(categories):
+    """Memory held by a {name: [str]} dict, counting every object once"""
+    seen = set()
+    total = sys.getsizeof(categories)
+    for name, words in categories.items():
+        for obj in (name, words, *words):
+            if id(obj) not in seen:
+                seen.add(id(obj))
+                total += sys.getsizeof(obj)
+    return total
+
+
+def pool_layout_bytes(pool, categories):
+    """Memory held by a pool and {name: PooledWords} over it"""
+    total = pool.nbytes() + sys.getsizeof(categories)
+    for name, words in categories.items():
+        total += sys.getsizeof(name) + sys.getsizeof(words) + sys.getsizeof(words.ids)
+    return total
+
+
+def memory_report(categories):
+    """Compare a {name: [words]} library with its pooled equivalent
+
+    Returns byte counts for both layouts along with word totals; the
+    pooled copy is built here and dropped again.
+    """
+    pool = WordPool()
+    pooled = {name: PooledWords(pool, pool.intern_many(words)) for name, words in categories.items()}
+    lists = list_layout_bytes(categories)
+    compact = pool_layout_bytes(pool, pooled)
+    return {
+        "categories": len(categories),
+        "words": sum(len(words) for words in categories.values()),
+        "distinct_words": len(pool),
+        "list_bytes": lists,
+        "pool_bytes": compact,
+        "ratio": lists / compact if compact else 0.0
+    }
@@ -0,0 +1,275 @@
+"""Compact binary snapshots of the category library
+
+A snapshot holds every category in one file that is read through mmap, so
+opening it costs nothing and a category's words are decoded only when
+asked for. Layout (all integers little-endian):
+
+    header      magic, version, category count, total words
+    categories  one record per category: name offset and length, data
+                offset and length, word count
+    names       UTF-8 category names
+    per category:
+      offsets   (count + 1) uint32 offsets of each word in its data
+      data      the words as UTF-8, each followed by a newline
+
+The offsets table is the string table's index: word i of a category is
+data[offsets[i]:offsets[i + 1] - 1]. Because words are lines, a whole
+category also decodes with a single decode and split.
+
+    python word_snapshot.py from-json subliminal_settings.json.bak library.snap
+    python word_snapshot.py to-json library.snap categories.json
+    python word_snapshot.py export library.snap      # from subliminal_library.db
+    python word_snapshot.py import library.snap
+"""
+import argparse
+from array import array
+from collections.abc import Sequence
+import itertools
+import json
+import mmap
+import operator
+import struct
+import sys
+
+SNAPSHOT_MAGIC = b"SUBSNAP\n"
+SNAPSHOT_VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+CATEGORY = struct.Struct("<QQQQQ")
+OFFSET = struct.Struct("<I")
+
+
+def encode_category(words):
+    """Return (offsets, data) for one category's words"""
+    words = list(words)
+    text = "\n".join(words) + "\n" if words else ""
+    data = text.encode("utf-8")
+    if data.count(b"\n") != len(words):
+        raise ValueError("a word contains a line break")
+    if len(data) > 0xFFFFFFFF:
+        raise ValueError("category too large for a snapshot (4 GB of text)")
+
+    # Byte length of each word plus its newline, all in C for ASCII text
+    lengths = map(len, words) if len(data) == len(text) else (len(word.encode("utf-8")) for word in words)
+    offsets = array("I", itertools.accumulate(map(operator.add, lengths, itertools.repeat(1)), initial=0))
+    if sys.byteorder == "big":
+        offsets.byteswap()
+    return offsets, data
+
+
+def write_snapshot(path, categories):
+    """Write {name: words} as a snapshot
+
+    categories may be any mapping whose values are iterables of words, such
+    as a CategoryStore; one category is held in memory at a time. Returns
+    the number of words written.
+    """
+    names = list(categories.keys())
+    encoded_names = [name.encode("utf-8") for name in names]
+    records = []
+    total = 0
+    with open(path, 'wb') as f:
+        # Header and category table are written last, once the offsets are known
+        f.write(b"\0" * (HEADER.size + CATEGORY.size * len(names)))
+        name_offsets = []
+        for encoded in encoded_names:
+            name_offsets.append(f.tell())
+            f.write(encoded)
+
+        for name, encoded, name_offset in zip(names, encoded_names, name_offsets):
+            offsets, data = encode_category(categories[name])
+            f.write(b"\0" * (-f.tell() % 4))  # Keep the offsets table aligned
+            f.write(offsets.tobytes())
+            data_offset = f.tell()
+            f.write(data)
+            count = len(offsets) - 1
+            records.append(CATEGORY.pack(name_offset, len(encoded), data_offset, len(data), count))
+            total += count
+
+        f.seek(0)
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(names), total))
+        f.write(b"".join(records))
+    return total
+
+
+class SnapshotWords(Sequence):
+    """One category of a snapshot, words decoded on access"""
+
+    def __init__(self, data, data_offset, data_length, count):
+        self.data = data
+        self.data_offset = data_offset
+        self.offsets_offset = data_offset - 4 * (count + 1)
+        self.data_length = data_length
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.count)
+            if step == 1:
+                return self.decode(start, stop)
+            return [self[i] for i in range(start, stop, step)]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("word index out of range")
+        start, end = struct.unpack_from("<II", self.data, self.offsets_offset + 4 * index)
+        return self.data[self.data_offset + start:self.data_offset + end - 1].decode("utf-8")
+
+    def decode(self, start, stop):
+        """Words start:stop with one decode and split"""
+        if start >= stop:
+            return []
+        first = OFFSET.unpack_from(self.data, self.offsets_offset + 4 * start)[0]
+        last = OFFSET.unpack_from(self.data, self.offsets_offset + 4 * stop)[0]
+        return self.data[self.data_offset + first:self.data_offset + last - 1].decode("utf-8").split("\n")
+
+    def __iter__(self):
+        return iter(self.decode(0, self.count))
+
+
+class Snapshot:
+    """Read-only, memory-mapped view of a snapshot file
+
+    Opening reads only the header and category table. snapshot[name]
+    decodes one category into a list; words(name) returns a lazy
+    SnapshotWords for random access without decoding it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, category_count, self.total_words = HEADER.unpack_from(self.data)
+        if magic != SNAPSHOT_MAGIC:
+            self.data.close()
+            raise ValueError(f"{path} is not a category snapshot")
+        if version != SNAPSHOT_VERSION:
+            self.data.close()
+            raise ValueError(f"{path} has unsupported snapshot version {version}")
+
+        self.categories = {}  # {name: (data offset, data length, word count)}
+        for i in range(category_count):
+            name_offset, name_length, data_offset, data_length, count = \
+                CATEGORY.unpack_from(self.data, HEADER.size + i * CATEGORY.size)
+            name = self.data[name_offset:name_offset + name_length].decode("utf-8")
+            self.categories[name] = (data_offset, data_length, count)
+
+    def close(self):
+        self.data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, name):
+        return name in self.categories
+
+    def __len__(self):
+        return len(self.categories)
+
+    def __iter__(self):
+        return iter(self.categories)
+
+    def names(self):
+        return sorted(self.categories)
+
+    def count(self, name):
+        return self.categories[name][2]
+
+    def words(self, name):
+        return SnapshotWords(self.data, *self.categories[name])
+
+    def __getitem__(self, name):
+        return self.words(name)[:]
+
+    def items(self):
+        for name in self.categories:
+            yield name, self[name]
+
+
+def read_json_categories(path):
+    """{name: words} from a JSON file in the app's old settings layout or a plain mapping
+
+    A settings file saved after the categories moved to the library has
+    no "categories" key; that raises ValueError rather than turning the
+    settings into a category.
+    """
+    with open(path, 'r', encoding="utf-8") as f:
+        data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path} does not hold a JSON object")
+    if "categories" in data:
+        return data["categories"]
+    if "settings" in data:
+        raise ValueError(f"{path} is a settings file without categories; they are in the library "
+                         f"(use 'export' instead)")
+    return data
+
+
+def json_to_snapshot(json_path, snapshot_path):
+    return write_snapshot(snapshot_path, read_json_categories(json_path))
+
+
+def snapshot_to_json(snapshot_path, json_path, settings=None):
+    """Write a snapshot out in the app's old JSON layout"""
+    with Snapshot(snapshot_path) as snapshot:
+        data = {"settings": settings or {}, "categories": dict(snapshot.items())}
+    with open(json_path, 'w', encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    return sum(len(words) for words in data["categories"].values())
+
+
+def export_library(store, snapshot_path):
+    """Write every category of a CategoryStore to a snapshot, reading one at a time"""
+    return write_snapshot(snapshot_path, store)
+
+
+def import_snapshot(store, snapshot_path):
+    """Add or replace the categories of a snapshot in a CategoryStore, in one transaction"""
+    with Snapshot(snapshot_path) as snapshot:
+        store.update_many({name: iter(snapshot.words(name)) for name in snapshot})
+        return snapshot.total_words
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert category libraries to and from binary snapshots")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name, help_text, first, second in (
+            ("from-json", "convert a JSON settings/categories file to a snapshot", "json", "snapshot"),
+            ("to-json", "convert a snapshot to the JSON layout", "snapshot", "json")):
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument(first)
+        command.add_argument(second)
+    for name, help_text in (("export", "write the library to a snapshot"),
+                            ("import", "add the categories of a snapshot to the library")):
+        command = sub.add_parser(name, help=help_text)
+        command.add_argument("snapshot")
+        command.add_argument("--library", default=None, help="library file (default subliminal_library.db)")
+    args = parser.parse_args()
+
+    if args.command == "from-json":
+        try:
+            count = json_to_snapshot(args.json, args.snapshot)
+        except ValueError as e:
+            parser.exit(1, f"from-json: {e}\n")
+    elif args.command == "to-json":
+        count = snapshot_to_json(args.snapshot, args.json)
+    else:
+        from word_library import CategoryStore, LIBRARY_FILE
+        store = CategoryStore(args.library or LIBRARY_FILE)
+        try:
+            if args.command == "export":
+                count = export_library(store, args.snapshot)
+            else:
+                count = import_snapshot(store, args.snapshot)
+        finally:
+            store.close()
+    print(f"{args.command}: {count:,} words")
+
+
+if __name__ == "__main__":
+    main()
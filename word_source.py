@@ -0,0 +1,518 @@
+"""Word sources the flash renderer pulls words from"""
+from array import array
+from bisect import bisect_right
+from collections import deque
+from collections.abc import Sequence
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+
+
+class ChainedWords(Sequence):
+    """Read-only sequence over several word lists, without copying them
+
+    starts holds the prefix sums of the list lengths, so len() is O(1) and
+    indexing finds the right list with a binary search in O(log k) for k
+    lists. Slices are assembled from slices of the underlying lists. Like
+    every list handed to WordSource, the lists must not be mutated while
+    the view is in use.
+    """
+
+    def __init__(self, lists, names=None):
+        # names, if given, labels each list (e.g. its category) for WeightedOrder
+        pairs = [(words, name) for words, name in zip(lists, names or itertools.repeat(None)) if len(words)]
+        self.lists = [words for words, name in pairs]
+        self.names = [name for words, name in pairs] if names is not None else None
+        self.starts = [0] + list(itertools.accumulate(len(words) for words in self.lists))
+        self.length = self.starts.pop()
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.slice(*index.indices(self.length))
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("word index out of range")
+        part = bisect_right(self.starts, index) - 1
+        return self.lists[part][index - self.starts[part]]
+
+    def slice(self, start, stop, step):
+        """Return words[start:stop:step] as a list"""
+        if step != 1:
+            return [self[i] for i in range(start, stop, step)]
+        result = []
+        part = bisect_right(self.starts, start) - 1
+        while start < stop and part < len(self.lists):
+            offset = self.starts[part]
+            words = self.lists[part]
+            result.extend(words[start - offset:stop - offset])
+            start = offset + len(words)
+            part += 1
+        return result
+
+    def __iter__(self):
+        return itertools.chain.from_iterable(self.lists)
+
+    def __repr__(self):
+        return f"ChainedWords({len(self.lists)} lists, {self.length} words)"
+
+
+class UniqueWords(Sequence):
+    """Read-only view of a word sequence without repeated words
+
+    Keeps the first occurrence of each word, in order. Building it is one
+    pass with a temporary set; afterwards only the kept positions are held
+    (4 bytes each), and words are read from the underlying sequence.
+    """
+
+    def __init__(self, words):
+        self.words = words
+        seen = set()
+        self.positions = array("I", (i for i, word in enumerate(words) if not (word in seen or seen.add(word))))
+        self.duplicates = len(words) - len(self.positions)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.words[i] for i in self.positions[index]]
+        return self.words[self.positions[index]]
+
+    def __repr__(self):
+        return f"UniqueWords({len(self.positions)} of {len(self.words)} words)"
+
+
+class WordOrder:
+    """Decides which word WordSource shows next
+
+    Every order has the same small interface, used by WordSource under its
+    lock:
+        reset(words, index)   a new word list was swapped in
+        next_index(words)     index of the next word to show
+        shown(words, index)   a picked word was actually flashed
+    Picks made for pre-rendering may be dropped again by a swap, so
+    anything that should only count flashed words belongs in shown().
+    Orders are plain picklable objects so the process renderer can take
+    one, state included, to its child process.
+    """
+
+    name = None
+
+    def reset(self, words, index=None):
+        pass
+
+    def next_index(self, words):
+        raise NotImplementedError
+
+    def shown(self, words, index):
+        pass
+
+
+class SequentialOrder(WordOrder):
+    """Walks the words in list order, wrapping around (the default)"""
+
+    name = "sequential"
+
+    def __init__(self, index=0):
+        self.index = index
+
+    def reset(self, words, index=None):
+        # Without an explicit index the position carries over, wrapped on the next read
+        if index is not None:
+            self.index = index
+
+    def next_index(self, words):
+        index = self.index % len(words)
+        self.index = (index + 1) % len(words)
+        return index
+
+
+class ShuffledOrder(WordOrder):
+    """Every word once per cycle in a seeded random order
+
+    A lazy Fisher-Yates shuffle: only positions that have been swapped are
+    stored, so starting a cycle is O(1) and each pick O(1) even on
+    million-word lists. The same seed and list give the same sequence.
+    """
+
+    name = "shuffle"
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.swapped = {}  # {position: index} for positions moved by the shuffle
+        self.drawn = 0     # Positions already handed out this cycle
+
+    def reset(self, words, index=None):
+        self.rng = random.Random(self.seed)
+        self.swapped = {}
+        self.drawn = 0
+
+    def next_index(self, words):
+        count = len(words)
+        if self.drawn >= count:
+            # Start a new cycle, continuing the random stream
+            self.swapped = {}
+            self.drawn = 0
+        pick = self.rng.randrange(self.drawn, count)
+        index = self.swapped.get(pick, pick)
+        self.swapped[pick] = self.swapped.pop(self.drawn, self.drawn)
+        self.drawn += 1
+        return index
+
+
+class PermutedOrder(WordOrder):
+    """Every word once per cycle in a random order, in constant memory
+
+    Unlike ShuffledOrder nothing grows with the number of words drawn,
+    which matters for file-backed lists of tens of millions of lines. The
+    order is a keyed Feistel permutation of the smallest square power of
+    two covering the list; positions that land past the end are skipped
+    (cycle walking, fewer than four steps per pick on average). Each cycle
+    draws new keys from the seeded random stream.
+    """
+
+    name = "permuted"
+    rounds = 4
+
+    def __init__(self, seed=None):
+        self.seed = seed
+        self.reset(())
+
+    def reset(self, words, index=None):
+        self.rng = random.Random(self.seed)
+        self.half_bits = max(1, (max(len(words) - 1, 1).bit_length() + 1) // 2)
+        self.start_cycle()
+
+    def start_cycle(self):
+        self.keys = [self.rng.getrandbits(64) for _ in range(self.rounds)]
+        self.position = 0
+
+    def permute(self, value):
+        mask = (1 << self.half_bits) - 1
+        left, right = value >> self.half_bits, value & mask
+        for key in self.keys:
+            # Hashes of int tuples are not randomized, so the child process agrees
+            left, right = right, left ^ (hash((right, key)) & mask)
+        return (left << self.half_bits) | right
+
+    def next_index(self, words):
+        count = len(words)
+        if count > 1 << (2 * self.half_bits):
+            self.reset(words)  # Grew past the permutation, e.g. without a reset
+        while True:
+            if self.position >= 1 << (2 * self.half_bits):
+                self.start_cycle()
+            index = self.permute(self.position)
+            self.position += 1
+            if index < count:
+                return index
+
+
+class ReservoirOrder(WordOrder):
+    """Random samples of sample_size words, each played in list order
+
+    A sample is drawn with reservoir sampling (Algorithm L), which skips
+    ahead geometrically instead of visiting every position, so drawing k
+    of n words costs O(k log(n / k)) and holds only the k chosen indices.
+    Playing a sample in list order keeps reads from a file-backed list
+    moving forward through the file.
+    """
+
+    name = "reservoir"
+
+    def __init__(self, sample_size=1000, seed=None):
+        self.sample_size = sample_size
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.pending = deque()
+
+    def reset(self, words, index=None):
+        self.rng = random.Random(self.seed)
+        self.pending = deque()
+
+    def sample(self, count):
+        size = min(self.sample_size, count)
+        reservoir = list(range(size))
+        rng = self.rng
+        weight = math.exp(math.log(1.0 - rng.random()) / size)
+        index = size - 1
+        while weight < 1.0:
+            index += int(math.log(1.0 - rng.random()) / math.log(1.0 - weight)) + 1
+            if index >= count:
+                return reservoir
+            reservoir[rng.randrange(size)] = index
+            weight *= math.exp(math.log(1.0 - rng.random()) / size)
+        return reservoir
+
+    def next_index(self, words):
+        if not self.pending:
+            self.pending = deque(sorted(self.sample(len(words))))
+        index = self.pending.popleft()
+        if index >= len(words):
+            self.pending.clear()  # Left over from a longer list
+            return self.next_index(words)
+        return index
+
+
+class FenwickTree:
+    """Binary indexed tree over non-negative weights
+
+    Point updates, prefix sums and "which slot holds cumulative weight x"
+    all in O(log n).
+    """
+
+    def __init__(self, weights=()):
+        self.tree = [0.0] * (len(weights) + 1)
+        for i, weight in enumerate(weights, 1):
+            self.tree[i] += weight
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def __len__(self):
+        return len(self.tree) - 1
+
+    def add(self, index, delta):
+        i = index + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, count):
+        """Sum of the first count weights"""
+        total = 0.0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def total(self):
+        return self.prefix(len(self))
+
+    def find(self, value):
+        """Smallest index whose prefix sum including itself exceeds value"""
+        index = 0
+        step = 1 << (len(self).bit_length())
+        while step:
+            nxt = index + step
+            if nxt < len(self.tree) and self.tree[nxt] <= value:
+                index = nxt
+                value -= self.tree[nxt]
+            step >>= 1
+        return min(index, len(self) - 1)
+
+
+class WeightedOrder(WordOrder):
+    """Random words, with categories picked in proportion to their weight
+
+    Works on a ChainedWords pool: a Fenwick tree holds weight * size for
+    each category, so a pick is a category lookup in O(log k) followed by
+    a uniform pick inside it. Categories without a weight count as 1; any
+    other sequence is treated as a single category.
+    """
+
+    name = "weighted"
+
+    def __init__(self, weights=None, seed=None):
+        self.weights = dict(weights or {})
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.tree = None
+        self.starts = [0]
+        self.sizes = []
+
+    def reset(self, words, index=None):
+        if isinstance(words, ChainedWords):
+            self.starts = words.starts
+            self.sizes = [len(part) for part in words.lists]
+            names = words.names or [None] * len(self.sizes)
+        else:
+            self.starts, self.sizes, names = [0], [len(words)], [None]
+        self.tree = FenwickTree([self.weights.get(name, 1.0) * size
+                                 for name, size in zip(names, self.sizes)])
+
+    def next_index(self, words):
+        if self.tree is None:
+            self.reset(words)
+        total = self.tree.total()
+        if total <= 0:
+            return self.rng.randrange(len(words))
+        part = self.tree.find(self.rng.random() * total)
+        return self.starts[part] + self.rng.randrange(self.sizes[part])
+
+
+class SpacedRepetitionOrder(WordOrder):
+    """Shows each word again after a growing interval
+
+    exposure maps word -> (times shown, next due as a time.time() value)
+    and is meant to be persisted between sessions. Words already in it
+    live in a heap ordered by due time; words never shown are introduced
+    in list order whenever nothing is due. Each pick is a heap pop and
+    push, O(log n). The n-th showing of a word schedules the next one
+    base_interval * factor ** (n - 1) seconds later, capped at
+    max_interval.
+
+    A pick only schedules the word provisionally in the heap; exposure is
+    recorded in shown(), once the word has really been flashed. reset()
+    is O(1): the list is scanned for shown words scan_step positions per
+    pick, so a swap never walks a long list while WordSource is locked.
+    Words due further down the list are picked up as the scan gets there.
+    """
+
+    name = "spaced"
+    scan_step = 4096
+
+    def __init__(self, exposure=None, base_interval=60.0, factor=2.0, max_interval=7 * 24 * 3600):
+        self.exposure = exposure if exposure is not None else {}
+        self.base_interval = base_interval
+        self.factor = factor
+        self.max_interval = max_interval
+        self.changed = set()  # Words whose exposure changed since take_changes()
+        self.reset(())
+
+    def reset(self, words, index=None):
+        self.heap = []
+        self.scanned = 0  # Positions before this have been checked against exposure
+        self.fresh = 0    # Next position to check for a never shown word, always <= scanned
+
+    def interval(self, count):
+        return min(self.max_interval, self.base_interval * self.factor ** (count - 1))
+
+    def scan(self, words):
+        """Add the shown words of the next scan_step positions to the heap"""
+        start = self.scanned
+        self.scanned = min(len(words), start + self.scan_step)
+        exposure = self.exposure
+        for index, word in enumerate(words[start:self.scanned], start):
+            entry = exposure.get(word)
+            if entry is not None:
+                heapq.heappush(self.heap, (entry[1], index))
+
+    def next_index(self, words):
+        if self.scanned < len(words):
+            self.scan(words)
+        now = time.time()
+        if self.heap and self.heap[0][0] <= now:
+            index = heapq.heappop(self.heap)[1]
+        else:
+            index = self.next_fresh(words)
+            if index is None:
+                while not self.heap and self.scanned < len(words):
+                    self.scan(words)
+                index = heapq.heappop(self.heap)[1]  # Nothing due, show the earliest
+
+        # Provisional, so the word isn't picked again before it is due
+        count = self.exposure.get(words[index], (0, 0.0))[0] + 1
+        heapq.heappush(self.heap, (now + self.interval(count), index))
+        return index
+
+    def next_fresh(self, words):
+        """Next never shown word among the scanned positions, checking at most scan_step"""
+        stop = min(self.scanned, self.fresh + self.scan_step)
+        while self.fresh < stop:
+            index = self.fresh
+            self.fresh += 1
+            if words[index] not in self.exposure:
+                return index
+        return None
+
+    def shown(self, words, index):
+        word = words[index]
+        count = self.exposure.get(word, (0, 0.0))[0] + 1
+        self.exposure[word] = (count, time.time() + self.interval(count))
+        self.changed.add(word)
+
+    def take_changes(self):
+        """Return {word: (count, due)} changed since the last call"""
+        changes = {word: self.exposure[word] for word in self.changed}
+        self.changed = set()
+        return changes
+
+
+ORDERS = {order.name: order for order in (SequentialOrder, ShuffledOrder, PermutedOrder, ReservoirOrder,
+                                          WeightedOrder, SpacedRepetitionOrder)}
+
+
+class WordSource:
+    """Thread-safe, hot-swappable list of words to flash
+
+    The Tk thread replaces the whole list with swap() while the renderer
+    keeps calling next_word(). Lists handed to swap() are treated as
+    immutable snapshots - edits build a new list and swap it in rather than
+    mutating the old one - so a swap is a reference assignment under a lock
+    and costs O(1) no matter how many words the list holds.
+
+    Which word comes next is decided by an order object (SequentialOrder
+    unless another one is set). Picks made for upcoming_words() are queued
+    so the renderer pre-renders exactly the words it will show next.
+    """
+
+    def __init__(self, words=(), order=None):
+        self.lock = threading.Lock()
+        self.words = words
+        self.order = order or SequentialOrder()
+        self.order.reset(words)
+        self.queue = deque()  # Indices already drawn from the order
+        self.version = 0  # Bumped on every swap
+
+    def __len__(self):
+        return len(self.words)
+
+    def swap(self, words, index=None):
+        """Replace the word list, optionally moving to a new position
+
+        Without an index the position carries over (wrapped to the new
+        length on the next read), so edits don't restart the cycle. Picks
+        queued for upcoming_words() were never shown, so the order goes
+        back to the first of them instead of skipping them.
+        """
+        with self.lock:
+            if index is None and self.queue:
+                index = self.queue[0]
+            self.words = words
+            self.order.reset(words, index)
+            self.queue.clear()
+            self.version += 1
+
+    def set_order(self, order, words=None):
+        """Switch to another order, optionally together with a new list"""
+        with self.lock:
+            if words is not None:
+                self.words = words
+            self.order = order
+            self.order.reset(self.words)
+            self.queue.clear()
+            self.version += 1
+
+    def snapshot(self):
+        """Return (words, order) as one consistent pair"""
+        with self.lock:
+            return self.words, self.order
+
+    def next_word(self):
+        """Return the next word and advance, or None if the list is empty"""
+        with self.lock:
+            words = self.words
+            if not words:
+                return None
+            index = self.queue.popleft() if self.queue else self.order.next_index(words)
+            self.order.shown(words, index)
+            return words[index]
+
+    def upcoming_words(self, count):
+        """Return the next count words without advancing"""
+        with self.lock:
+            words = self.words
+            if not words:
+                return []
+            while len(self.queue) < count:
+                self.queue.append(self.order.next_index(words))
+            return [words[self.queue[i]] for i in range(count)]
@@ -0,0 +1,174 @@
+"""Tk views over word lists and categories"""
+from bisect import bisect_left
+import tkinter as tk
+
+
+class PagedWordView:
+    """Shows one page of a (possibly huge) word list in a Text widget
+
+    Only page_size lines are ever inserted into the widget, so showing a
+    new list costs the same at any list size. Edits are picked up per page:
+    when the user moves to another page or asks for the words, the visible
+    lines are compared with the slice they were rendered from and, if they
+    differ, recorded as one (start, stop, new_words) edit.
+
+    The list passed to set_words() is never modified. Edited pages produce
+    a new list in words, and edits holds the splices that turn the original
+    into it (see CategoryStore.splice). Lists shown with editable=False
+    (e.g. a file flashed without importing it) are browse-only.
+    """
+
+    def __init__(self, text, page_size=500, on_page=None):
+        self.text = text
+        self.page_size = page_size
+        self.on_page = on_page  # Called after a page is shown
+        self.words = []
+        self.start = 0
+        self.edits = []
+        self.editable = True
+
+    @property
+    def modified(self):
+        """True if any line was edited, on this page or an earlier one"""
+        return bool(self.edits) or (self.editable and bool(self.text.edit_modified()))
+
+    def set_words(self, words, editable=True):
+        """Show a new list from its first page and forget pending edits"""
+        self.words = words
+        self.start = 0
+        self.edits = []
+        self.editable = editable
+        self.show()
+
+    def show(self):
+        """Render the current page"""
+        self.text.config(state=tk.NORMAL)
+        self.text.delete(1.0, tk.END)
+        self.text.insert(1.0, "\n".join(self.words[self.start:self.start + self.page_size]))
+        self.text.edit_modified(False)
+        if not self.editable:
+            self.text.config(state=tk.DISABLED)
+        if self.on_page is not None:
+            self.on_page()
+
+    def page_count(self):
+        return max(1, -(-len(self.words) // self.page_size))
+
+    def page(self):
+        return self.start // self.page_size
+
+    def describe(self):
+        """Position text for a page label, e.g. 'Lines 501-1000 of 120,000'"""
+        if not self.words:
+            return "No words"
+        end = min(self.start + self.page_size, len(self.words))
+        return f"Lines {self.start + 1:,}-{end:,} of {len(self.words):,}"
+
+    def go_to_page(self, page):
+        self.commit_page()
+        page = max(0, min(page, self.page_count() - 1))
+        self.start = page * self.page_size
+        self.show()
+
+    def next_page(self):
+        self.go_to_page(self.page() + 1)
+
+    def previous_page(self):
+        self.go_to_page(self.page() - 1)
+
+    def commit_page(self):
+        """Record the visible page's edits, if any"""
+        if not self.editable or not self.text.edit_modified():
+            return
+        self.text.edit_modified(False)
+
+        stop = min(self.start + self.page_size, len(self.words))
+        lines = [line.strip() for line in self.text.get(1.0, tk.END).split('\n') if line.strip()]
+        if lines == self.words[self.start:stop]:
+            return
+
+        self.edits.append((self.start, stop, lines))
+        self.words = self.words[:self.start] + lines + self.words[stop:]
+
+    def saved(self):
+        """Forget the recorded edits once they have been applied elsewhere"""
+        self.edits = []
+
+    def get_words(self):
+        """Return the list including all edits made so far"""
+        self.commit_page()
+        return self.words
+
+
+class CategoryListModel:
+    """Sorted category names mirrored into a Listbox
+
+    names holds every category in sorted order and visible the ones that
+    match the filter, which are exactly the listbox rows. Adding or removing
+    a category finds its row with bisect and inserts or deletes just that
+    row, so the listbox (and its selection) is never rebuilt for a single
+    change. Only changing the filter re-fills the listbox.
+    """
+
+    def __init__(self, listbox):
+        self.listbox = listbox
+        self.names = []
+        self.visible = []
+        self.filter = ""  # Case-insensitive substring, "" shows everything
+
+    def matches(self, name):
+        return self.filter in name.casefold()
+
+    def find(self, names, name):
+        """Index of name in a sorted list, or None"""
+        i = bisect_left(names, name)
+        return i if i < len(names) and names[i] == name else None
+
+    def set_names(self, names):
+        """Replace all names and re-fill the listbox"""
+        self.names = sorted(names)
+        self.refill()
+
+    def set_filter(self, text):
+        self.filter = text.strip().casefold()
+        self.refill()
+
+    def refill(self):
+        self.visible = [name for name in self.names if self.matches(name)] if self.filter else list(self.names)
+        self.listbox.delete(0, tk.END)
+        if self.visible:
+            self.listbox.insert(tk.END, *self.visible)
+
+    def add(self, name):
+        """Insert one name in sorted position, no-op if it is already there"""
+        i = bisect_left(self.names, name)
+        if i < len(self.names) and self.names[i] == name:
+            return
+        self.names.insert(i, name)
+        if self.matches(name):
+            row = bisect_left(self.visible, name)
+            self.visible.insert(row, name)
+            self.listbox.insert(row, name)
+
+    def remove(self, name):
+        i = self.find(self.names, name)
+        if i is None:
+            return
+        del self.names[i]
+        row = self.find(self.visible, name)
+        if row is not None:
+            del self.visible[row]
+            self.listbox.delete(row)
+
+    def is_visible(self, name):
+        return self.find(self.visible, name) is not None
+
+    def selected_names(self):
+        return [self.visible[row] for row in self.listbox.curselection()]
+
+    def select(self, names):
+        """Select the rows of the given names that are currently shown"""
+        for name in names:
+            row = self.find(self.visible, name)
+            if row is not None:
+                self.listbox.selection_set(row)